@@ -34,6 +34,8 @@ class NodeItem(QGraphicsRectItem):
         self.pen = QPen(Qt.black)
         self.setPen(self.pen)
 
+        self.edges = []
+
         self.text1 = text1
         self.text2 = text2
         self.text_item1 = QGraphicsTextItem(text1, self)
@@ -55,6 +57,21 @@ class NodeItem(QGraphicsRectItem):
         w = max(r1.width(), r2.width()) + padding * 2
         h = r1.height() + r2.height() + padding * 2
         self.setRect(0, 0, max(w, self.min_width), max(h, self.min_height))
+        for e in self.edges:
+            e.update_position()
+
+    def add_edge(self, edge):
+        self.edges.append(edge)
+
+    def remove_edge(self, edge):
+        if edge in self.edges:
+            self.edges.remove(edge)
+
+    def itemChange(self, change, value):
+        if change == QGraphicsRectItem.ItemPositionHasChanged:
+            for e in self.edges:
+                e.update_position()
+        return super().itemChange(change, value)
 
     def center_texts(self):
         r = self.rect()
@@ -150,6 +167,7 @@ class NodeItem(QGraphicsRectItem):
         elif action == del_act:
             for e in list(scene.edges):
                 if e.source == self or e.dest == self:
+                    e.detach()
                     scene.removeItem(e)
                     scene.edges.remove(e)
             scene.removeItem(self)
@@ -170,9 +188,15 @@ class EdgeItem(QGraphicsLineItem):
         f = QFont(); f.setPointSize(8)
         self.text_item.setFont(f)
         self.text_item.setDefaultTextColor(Qt.black)
+        self.source.add_edge(self)
+        self.dest.add_edge(self)
         self.update_position()
         self.setZValue(-1)
 
+    def detach(self):
+        self.source.remove_edge(self)
+        self.dest.remove_edge(self)
+
     def update_position(self):
         s = self.source.sceneBoundingRect().center()
         d = self.dest.sceneBoundingRect().center()
@@ -183,7 +207,6 @@ class EdgeItem(QGraphicsLineItem):
         self.text_item.setPos(mx - r.width()/2, my - r.height() - 5)
 
     def paint(self, painter, option, widget):
-        self.update_position()
         painter.setPen(self.pen)
         painter.drawLine(self.line())
 
@@ -209,6 +232,7 @@ class EdgeItem(QGraphicsLineItem):
                 self.update_position()
                 scene.parent.update_table()
         elif action == del_act:
+            self.detach()
             scene.removeItem(self)
             scene.edges.remove(self)
             scene.parent.update_table()
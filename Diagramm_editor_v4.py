@@ -2,8 +2,192 @@ import tkinter as tk
 from tkinter import simpledialog, colorchooser, messagebox, filedialog
 import tkinter.ttk as ttk
 import json
+import time
+from collections import deque
 from PIL import ImageGrab
 
+# Undo-Historie aus kleinen Änderungsbefehlen statt kompletter JSON-Zustände.
+# Der Speicherbedarf wird grob geschätzt (Bytes) und nach oben begrenzt;
+# aufeinanderfolgende Verschiebungen desselben Kästchens werden zusammengefasst
+UNDO_MEMORY_BUDGET = 1 << 20
+MOVE_MERGE_SECONDS = 1.0
+
+# Räumlicher Index: gleichmäßiges Gitter, jede Zelle kennt die Kästchen, die
+# sie berühren. Trefferradius für Klicks auf Verbindungen in Pixeln
+GRID_CELL_SIZE = 200
+CONNECTION_HIT_TOLERANCE = 3
+
+# Mausbewegungen beim Ziehen werden gesammelt und höchstens einmal pro
+# Bildaufbau (~60 Hz) auf den Canvas übertragen
+DRAG_FRAME_MS = 16
+
+def grid_cells(left, top, right, bottom, size=GRID_CELL_SIZE):
+    for cx in range(int(left // size), int(right // size) + 1):
+        for cy in range(int(top // size), int(bottom // size) + 1):
+            yield cx, cy
+
+SHAPE_OF_CANVAS_TYPE = {"rectangle": "rectangle", "oval": "oval", "polygon": "diamond"}
+
+class Command:
+    cost = 64
+
+    def undo(self, editor):
+        raise NotImplementedError
+
+    def redo(self, editor):
+        raise NotImplementedError
+
+    def merge(self, other):
+        return False
+
+class MoveBoxCommand(Command):
+    def __init__(self, box, dx, dy):
+        self.box = box
+        self.dx = dx
+        self.dy = dy
+        self.time = time.monotonic()
+
+    def undo(self, editor):
+        editor.move_box(self.box, -self.dx, -self.dy)
+
+    def redo(self, editor):
+        editor.move_box(self.box, self.dx, self.dy)
+
+    def merge(self, other):
+        if (isinstance(other, MoveBoxCommand) and other.box is self.box
+                and other.time - self.time <= MOVE_MERGE_SECONDS):
+            self.dx += other.dx
+            self.dy += other.dy
+            self.time = other.time
+            return True
+        return False
+
+# Farbe ("rect", "fill") oder Text ("label", "text") eines Kästchens
+class ItemConfigCommand(Command):
+    def __init__(self, box, part, option, old, new):
+        self.box = box
+        self.part = part
+        self.option = option
+        self.old = old
+        self.new = new
+        self.cost = 64 + len(str(old)) + len(str(new))
+
+    def undo(self, editor):
+        editor.canvas.itemconfig(self.box[self.part], **{self.option: self.old})
+
+    def redo(self, editor):
+        editor.canvas.itemconfig(self.box[self.part], **{self.option: self.new})
+
+class ShapeCommand(Command):
+    def __init__(self, box, old, new):
+        self.box = box
+        self.old = old
+        self.new = new
+
+    def undo(self, editor):
+        editor.set_box_shape(self.box, self.old)
+
+    def redo(self, editor):
+        editor.set_box_shape(self.box, self.new)
+
+class AddBoxCommand(Command):
+    def __init__(self, box):
+        self.box = box
+        self.data = None
+
+    def undo(self, editor):
+        self.data = editor.detach_box(self.box)
+
+    def redo(self, editor):
+        editor.attach_box(self.box, self.data)
+
+# Gelöschtes Kästchen samt Zeichendaten und den mitgelöschten Verbindungen
+class RemoveBoxCommand(Command):
+    def __init__(self, box, data, connections):
+        self.box = box
+        self.data = data
+        self.connections = connections
+        self.cost = 128 + 32 * len(connections) + len(data["text"])
+
+    def undo(self, editor):
+        editor.attach_box(self.box, self.data)
+        for conn in self.connections:
+            editor.attach_connection(conn)
+
+    def redo(self, editor):
+        for conn in self.connections:
+            editor.detach_connection(conn)
+        editor.detach_box(self.box)
+
+class AddConnectionCommand(Command):
+    def __init__(self, conn):
+        self.conn = conn
+
+    def undo(self, editor):
+        editor.detach_connection(self.conn)
+
+    def redo(self, editor):
+        editor.attach_connection(self.conn)
+
+class RemoveConnectionCommand(AddConnectionCommand):
+    def undo(self, editor):
+        super().redo(editor)
+
+    def redo(self, editor):
+        super().undo(editor)
+
+# Mehrere Änderungen als ein Undo-Schritt, z. B. das Laden eines Zustands
+class MacroCommand(Command):
+    def __init__(self, commands):
+        self.commands = commands
+        self.cost = 64 + sum(command.cost for command in commands)
+
+    def undo(self, editor):
+        for command in reversed(self.commands):
+            command.undo(editor)
+
+    def redo(self, editor):
+        for command in self.commands:
+            command.redo(editor)
+
+class UndoHistory:
+    def __init__(self, editor, budget=UNDO_MEMORY_BUDGET):
+        self.editor = editor
+        self.budget = budget
+        self.undo_stack = deque()
+        self.redo_stack = []
+        self.cost = 0
+
+    def push(self, command):
+        self.redo_stack.clear()
+        if self.undo_stack and self.undo_stack[-1].merge(command):
+            return
+        self.undo_stack.append(command)
+        self.cost += command.cost
+        while self.cost > self.budget and len(self.undo_stack) > 1:
+            self.cost -= self.undo_stack.popleft().cost
+
+    def undo(self):
+        if not self.undo_stack:
+            return
+        command = self.undo_stack.pop()
+        self.cost -= command.cost
+        command.undo(self.editor)
+        self.redo_stack.append(command)
+
+    def redo(self):
+        if not self.redo_stack:
+            return
+        command = self.redo_stack.pop()
+        command.redo(self.editor)
+        self.undo_stack.append(command)
+        self.cost += command.cost
+
+    def clear(self):
+        self.undo_stack.clear()
+        self.redo_stack.clear()
+        self.cost = 0
+
 class DiagramEditor(tk.Tk):
     def __init__(self):
         super().__init__()
@@ -13,13 +197,23 @@ class DiagramEditor(tk.Tk):
         self.canvas = tk.Canvas(self, bg="white")
         self.canvas.pack(fill=tk.BOTH, expand=True)
 
-        self.boxes = []
-        self.connections = []
-
-        self.undo_stack = []
-        self.redo_stack = []
-
-        self.drag_data = {"item": None, "x": 0, "y": 0}
+        # Kästchen und Verbindungen nach ihrer festen ID (auch im gespeicherten
+        # Zustand); Dicts halten die Reihenfolge und entfernen in O(1)
+        self.boxes = {}
+        self.connections = {}
+        self.next_box_id = 0
+        self.next_connection_id = 0
+        self.grid = {}
+        self.box_cells = {}
+        self.connection_by_line = {}
+        # Kästchen-ID -> {Verbindungs-ID: Verbindung}
+        self.adjacency = {}
+        self.selected_boxes = []
+        self.drag_job = None
+
+        self.history = UndoHistory(self)
+
+        self.drag_data = {"item": None, "x": 0, "y": 0, "dx": 0, "dy": 0, "target": (0, 0), "band": None}
         self.connect_mode = False
         self.connect_from_box = None
         self.selected_box = None
@@ -91,11 +285,26 @@ class DiagramEditor(tk.Tk):
         self.bind("<Control-y>", lambda e: self.menu_redo())
         self.bind("<Control-n>", lambda e: self.menu_new())
         self.bind("<Control-t>", lambda e: self.menu_add_box_with_template())  # STRG+T → Vorlage
-
-        # --- Initial leeren Zustand speichern (Undo sofort aktiv!) ---
-        self.save_state()
+        self.bind("<Delete>", lambda e: self.delete_selection())
     # --- Box & Connection ---
-    def create_box(self, x, y, text, color):
+    def register_box(self, box, box_id=None):
+        if box_id is None:
+            box_id = self.next_box_id
+        box["id"] = box_id
+        self.next_box_id = max(self.next_box_id, box_id + 1)
+        self.boxes[box_id] = box
+        self.index_box(box)
+
+    def register_connection(self, conn, conn_id=None):
+        if conn_id is None:
+            conn_id = self.next_connection_id
+        conn["id"] = conn_id
+        self.next_connection_id = max(self.next_connection_id, conn_id + 1)
+        self.connections[conn_id] = conn
+        self.connection_by_line[conn["line"]] = conn
+        self.link_connection(conn)
+
+    def create_box(self, x, y, text, color, select=True, box_id=None):
         box_width = 120
         box_height = 60
         rect = self.canvas.create_rectangle(
@@ -107,9 +316,9 @@ class DiagramEditor(tk.Tk):
             text=text, font=("Arial", 12, "bold")
         )
         box = {"rect": rect, "label": label}
-        self.boxes.append(box)
-        self.select_box(box)
-        self.save_state()
+        self.register_box(box, box_id)
+        if select:
+            self.select_box(box)
         return box
 
     def create_box_with_shape(self, x, y, template):
@@ -135,36 +344,165 @@ class DiagramEditor(tk.Tk):
             )
         else:
             messagebox.showwarning("Fehler", "Unbekannte Form: " + template["shape"])
-            return
+            return None
 
         label = self.canvas.create_text(
             x + box_width / 2, y + box_height / 2,
             text=template["name"], font=("Arial", 12, "bold")
         )
         box = {"rect": shape, "label": label}
-        self.boxes.append(box)
+        self.register_box(box)
         self.select_box(box)
-        self.save_state()
+        return box
 
-    def create_connection(self, box1, box2):
+    def create_connection(self, box1, box2, conn_id=None):
         to_x, to_y = self.get_box_center(box2)
         from_x, from_y = self.get_box_center(box1)
         start_x, start_y = self.get_box_edge_point(box1, to_x, to_y)
         end_x, end_y = self.get_box_edge_point(box2, from_x, from_y)
         line = self.canvas.create_line(start_x, start_y, end_x, end_y, arrow=tk.LAST, width=2)
         connection = {"line": line, "from": box1, "to": box2}
-        self.connections.append(connection)
-        self.save_state()
+        self.register_connection(connection, conn_id)
+        return connection
+
+    # --- Bausteine für Undo/Redo: Kästchen und Verbindungen vom Canvas
+    # nehmen und mit denselben Modellobjekten wiederherstellen ---
+    def box_data(self, box):
+        return {
+            "type": self.canvas.type(box["rect"]),
+            "coords": self.canvas.coords(box["rect"]),
+            "color": self.canvas.itemcget(box["rect"], "fill"),
+            "label_coords": self.canvas.coords(box["label"]),
+            "text": self.get_box_text(box)
+        }
 
-    def get_box_center(self, box):
+    def detach_box(self, box):
+        data = self.box_data(box)
+        self.canvas.delete(box["rect"])
+        self.canvas.delete(box["label"])
+        del self.boxes[box["id"]]
+        self.adjacency.pop(box["id"], None)
+        self.unindex_box(box)
+        if self.selected_box is box:
+            self.selected_box = None
+        self.selected_boxes = [b for b in self.selected_boxes if b is not box]
+        return data
+
+    def attach_box(self, box, data):
+        create = {
+            "rectangle": self.canvas.create_rectangle,
+            "oval": self.canvas.create_oval,
+            "polygon": self.canvas.create_polygon
+        }[data["type"]]
+        box["rect"] = create(*data["coords"], fill=data["color"], outline="black", width=2)
+        box["label"] = self.canvas.create_text(*data["label_coords"], text=data["text"],
+                                               font=("Arial", 12, "bold"))
+        self.boxes[box["id"]] = box
+        self.index_box(box)
+
+    def detach_connection(self, conn):
+        self.canvas.delete(conn["line"])
+        del self.connections[conn["id"]]
+        del self.connection_by_line[conn["line"]]
+        for box in (conn["from"], conn["to"]):
+            self.adjacency[box["id"]].pop(conn["id"], None)
+
+    def attach_connection(self, conn):
+        conn["line"] = self.canvas.create_line(0, 0, 0, 0, arrow=tk.LAST, width=2)
+        self.connections[conn["id"]] = conn
+        self.connection_by_line[conn["line"]] = conn
+        self.link_connection(conn)
+        self.update_connection(conn)
+
+    def link_connection(self, conn):
+        for box in (conn["from"], conn["to"]):
+            self.adjacency.setdefault(box["id"], {})[conn["id"]] = conn
+
+    def move_box(self, box, dx, dy):
+        self.canvas.move(box["rect"], dx, dy)
+        self.canvas.move(box["label"], dx, dy)
+        self.index_box(box)
+        self.update_box_connections(box)
+
+    # --- Räumlicher Index ---
+    def index_box(self, box):
+        self.unindex_box(box)
+        cells = list(grid_cells(*self.get_box_bounds(box)))
+        for cell in cells:
+            self.grid.setdefault(cell, {})[box["id"]] = box
+        self.box_cells[box["id"]] = cells
+
+    def unindex_box(self, box):
+        for cell in self.box_cells.pop(box["id"], ()):
+            bucket = self.grid[cell]
+            del bucket[box["id"]]
+            if not bucket:
+                del self.grid[cell]
+
+    def rebuild_index(self):
+        self.grid.clear()
+        self.box_cells.clear()
+        for box in self.boxes.values():
+            self.index_box(box)
+
+    def boxes_in_rect(self, x1, y1, x2, y2):
+        left, right = min(x1, x2), max(x1, x2)
+        top, bottom = min(y1, y2), max(y1, y2)
+        cell_count = ((right - left) // GRID_CELL_SIZE + 1) * ((bottom - top) // GRID_CELL_SIZE + 1)
+        if cell_count > len(self.grid):
+            candidates = self.boxes.values()
+        else:
+            candidates = {}
+            for cell in grid_cells(left, top, right, bottom):
+                candidates.update(self.grid.get(cell, {}))
+            candidates = candidates.values()
+        found = []
+        for box in candidates:
+            box_left, box_top, box_right, box_bottom = self.get_box_bounds(box)
+            if box_left <= right and box_right >= left and box_top <= bottom and box_bottom >= top:
+                found.append(box)
+        return found
+
+    def box_shape(self, box):
+        return SHAPE_OF_CANVAS_TYPE[self.canvas.type(box["rect"])]
+
+    def set_box_shape(self, box, shape_name):
+        color = self.canvas.itemcget(box["rect"], "fill")
+        x1, y1, x2, y2 = self.get_box_bounds(box)
+        if shape_name == "rectangle":
+            new_shape = self.canvas.create_rectangle(x1, y1, x2, y2, fill=color, outline="black", width=2)
+        elif shape_name == "oval":
+            new_shape = self.canvas.create_oval(x1, y1, x2, y2, fill=color, outline="black", width=2)
+        elif shape_name == "diamond":
+            cx = (x1 + x2) / 2
+            cy = (y1 + y2) / 2
+            new_shape = self.canvas.create_polygon(
+                cx, y1, x2, cy, cx, y2, x1, cy,
+                fill=color, outline="black", width=2
+            )
+        else:
+            return False
+        self.canvas.delete(box["rect"])
+        self.canvas.tag_lower(new_shape, box["label"])
+        box["rect"] = new_shape
+        if any(b is box for b in self.selected_boxes):
+            self.canvas.itemconfig(new_shape, width=5)
+        self.update_box_connections(box)
+        return True
+
+    # Rechteck/Oval liefern zwei Eckpunkte, die Raute vier Polygonpunkte
+    def get_box_bounds(self, box):
         coords = self.canvas.coords(box["rect"])
-        x_center = (coords[0] + coords[2]) / 2
-        y_center = (coords[1] + coords[3]) / 2
+        return min(coords[0::2]), min(coords[1::2]), max(coords[0::2]), max(coords[1::2])
+
+    def get_box_center(self, box):
+        left, top, right, bottom = self.get_box_bounds(box)
+        x_center = (left + right) / 2
+        y_center = (top + bottom) / 2
         return x_center, y_center
 
     def get_box_edge_point(self, box, target_x, target_y):
-        coords = self.canvas.coords(box["rect"])
-        left, top, right, bottom = coords
+        left, top, right, bottom = self.get_box_bounds(box)
         cx = (left + right) / 2
         cy = (top + bottom) / 2
 
@@ -185,23 +523,45 @@ class DiagramEditor(tk.Tk):
 
         return x, y
 
-    def update_connections(self):
-        for conn in self.connections:
-            to_x, to_y = self.get_box_center(conn["to"])
-            from_x, from_y = self.get_box_center(conn["from"])
-            start_x, start_y = self.get_box_edge_point(conn["from"], to_x, to_y)
-            end_x, end_y = self.get_box_edge_point(conn["to"], from_x, from_y)
-            self.canvas.coords(conn["line"], start_x, start_y, end_x, end_y)
+    def update_connection(self, conn):
+        to_x, to_y = self.get_box_center(conn["to"])
+        from_x, from_y = self.get_box_center(conn["from"])
+        start_x, start_y = self.get_box_edge_point(conn["from"], to_x, to_y)
+        end_x, end_y = self.get_box_edge_point(conn["to"], from_x, from_y)
+        self.canvas.coords(conn["line"], start_x, start_y, end_x, end_y)
+
+    def update_box_connections(self, box):
+        for conn in self.adjacency.get(box["id"], {}).values():
+            self.update_connection(conn)
 
+    def update_connections(self):
+        for conn in self.connections.values():
+            self.update_connection(conn)
+
+    # Liegt der Punkt in der Form selbst? Oval und Raute in normierten
+    # Koordinaten (Mittelpunkt 0, Halbachsen 1)
+    def box_contains(self, box, x, y):
+        left, top, right, bottom = self.get_box_bounds(box)
+        if not (left <= x <= right and top <= y <= bottom):
+            return False
+        shape = self.box_shape(box)
+        if shape == "rectangle":
+            return True
+        nx = (2 * x - left - right) / (right - left)
+        ny = (2 * y - top - bottom) / (bottom - top)
+        if shape == "oval":
+            return nx * nx + ny * ny <= 1
+        return abs(nx) + abs(ny) <= 1
+
+    # Treffer über die Gitterzelle des Klickpunkts; bei Überlappung liegt das
+    # Kästchen mit der jüngeren Beschriftung oben
     def find_box_at(self, x, y):
-        found = self.canvas.find_closest(x, y)
-        if not found or len(found) == 0:
-            return None
-        item = found[0]
-        for box in self.boxes:
-            if item == box["rect"] or item == box["label"]:
-                return box
-        return None
+        x, y = self.canvas.canvasx(x), self.canvas.canvasy(y)
+        hit = None
+        for box in self.grid.get((int(x // GRID_CELL_SIZE), int(y // GRID_CELL_SIZE)), {}).values():
+            if (hit is None or box["label"] > hit["label"]) and self.box_contains(box, x, y):
+                hit = box
+        return hit
 
     def get_box_text(self, box):
         return self.canvas.itemcget(box["label"], "text")
@@ -213,23 +573,56 @@ class DiagramEditor(tk.Tk):
             self.drag_data["item"] = clicked_box
             self.drag_data["x"] = event.x
             self.drag_data["y"] = event.y
+            self.drag_data["dx"] = 0
+            self.drag_data["dy"] = 0
             self.select_box(clicked_box)
+        else:
+            # Auswahlrechteck aufziehen
+            self.drag_data["x"] = event.x
+            self.drag_data["y"] = event.y
+            self.drag_data["band"] = self.canvas.create_rectangle(
+                event.x, event.y, event.x, event.y, outline="gray", dash=(4, 2))
 
     def do_drag(self, event):
         if self.drag_data["item"]:
-            dx = event.x - self.drag_data["x"]
-            dy = event.y - self.drag_data["y"]
-            box = self.drag_data["item"]
-            self.canvas.move(box["rect"], dx, dy)
-            self.canvas.move(box["label"], dx, dy)
-            self.drag_data["x"] = event.x
-            self.drag_data["y"] = event.y
-            self.update_connections()
+            self.drag_data["target"] = (event.x, event.y)
+            if self.drag_job is None:
+                self.drag_job = self.after(DRAG_FRAME_MS, self.flush_drag)
+        elif self.drag_data["band"]:
+            self.canvas.coords(self.drag_data["band"], self.drag_data["x"], self.drag_data["y"], event.x, event.y)
+
+    def flush_drag(self):
+        self.drag_job = None
+        box = self.drag_data["item"]
+        if not box:
+            return
+        x, y = self.drag_data["target"]
+        dx = x - self.drag_data["x"]
+        dy = y - self.drag_data["y"]
+        if not dx and not dy:
+            return
+        self.canvas.move(box["rect"], dx, dy)
+        self.canvas.move(box["label"], dx, dy)
+        self.drag_data["x"] = x
+        self.drag_data["y"] = y
+        self.drag_data["dx"] += dx
+        self.drag_data["dy"] += dy
+        self.index_box(box)
+        self.update_box_connections(box)
 
     def stop_drag(self, event):
-        if self.drag_data["item"]:
-            self.save_state()
+        if self.drag_job is not None:
+            self.after_cancel(self.drag_job)
+            self.flush_drag()
+        box = self.drag_data["item"]
+        if box and (self.drag_data["dx"] or self.drag_data["dy"]):
+            self.history.push(MoveBoxCommand(box, self.drag_data["dx"], self.drag_data["dy"]))
         self.drag_data["item"] = None
+        if self.drag_data["band"]:
+            x1, y1, x2, y2 = self.canvas.coords(self.drag_data["band"])
+            self.canvas.delete(self.drag_data["band"])
+            self.drag_data["band"] = None
+            self.select_boxes(self.boxes_in_rect(x1, y1, x2, y2))
 
     # --- Doppelklick → Text ändern ---
     def handle_double_click(self, event):
@@ -238,8 +631,7 @@ class DiagramEditor(tk.Tk):
             self.select_box(clicked_box)
             new_text = simpledialog.askstring("Text ändern", "Neuer Text:")
             if new_text:
-                self.canvas.itemconfig(clicked_box["label"], text=new_text)
-                self.save_state()
+                self.set_box_text(clicked_box, new_text)
 
     # --- Right Click → Kontextmenü anzeigen! ---
     def handle_right_click(self, event):
@@ -250,84 +642,153 @@ class DiagramEditor(tk.Tk):
 
     # --- Selection (fetter Rahmen) ---
     def select_box(self, box):
-        for b in self.boxes:
+        self.select_boxes([box])
+
+    def select_boxes(self, boxes):
+        for b in self.selected_boxes:
             self.canvas.itemconfig(b["rect"], width=2)
-        self.canvas.itemconfig(box["rect"], width=5)
-        self.selected_box = box
+        for b in boxes:
+            self.canvas.itemconfig(b["rect"], width=5)
+        self.selected_boxes = list(boxes)
+        self.selected_box = boxes[-1] if boxes else None
 
     # --- Zoom ---
     def zoom(self, event):
         factor = 1.1 if event.delta > 0 or event.num == 4 else 0.9
         self.scale_factor *= factor
         self.canvas.scale(tk.ALL, event.x, event.y, factor, factor)
+        self.rebuild_index()
         self.update_connections()
     def find_connection_at(self, x, y):
-        found = self.canvas.find_closest(x, y)
-        if not found or len(found) == 0:
-            return None
-        item = found[0]
-        for conn in self.connections:
-            if conn["line"] == item:
+        x, y = self.canvas.canvasx(x), self.canvas.canvasy(y)
+        tolerance = CONNECTION_HIT_TOLERANCE
+        for item in reversed(self.canvas.find_overlapping(x - tolerance, y - tolerance, x + tolerance, y + tolerance)):
+            conn = self.connection_by_line.get(item)
+            if conn:
                 return conn
         return None
 
     # --- Undo / Redo ---
-    def save_state(self):
+    def set_box_text(self, box, text):
+        old = self.get_box_text(box)
+        self.canvas.itemconfig(box["label"], text=text)
+        self.history.push(ItemConfigCommand(box, "label", "text", old, text))
+
+    def set_box_color(self, box, color):
+        old = self.canvas.itemcget(box["rect"], "fill")
+        self.canvas.itemconfig(box["rect"], fill=color)
+        self.history.push(ItemConfigCommand(box, "rect", "fill", old, color))
+
+    # Nach ID sortiert, damit die Datei nicht von der Reihenfolge abhängt, in
+    # der Undo/Redo Kästchen und Verbindungen wieder eingefügt hat
+    def serialize_state(self):
         state = {
             "boxes": [],
             "connections": []
         }
-        for box in self.boxes:
-            coords = self.canvas.coords(box["rect"])
+        for box in sorted(self.boxes.values(), key=lambda box: box["id"]):
+            left, top, _, _ = self.get_box_bounds(box)
             state["boxes"].append({
-                "x": coords[0],
-                "y": coords[1],
+                "id": box["id"],
+                "x": left,
+                "y": top,
                 "text": self.get_box_text(box),
                 "color": self.canvas.itemcget(box["rect"], "fill")
             })
-        for conn in self.connections:
+        for conn in sorted(self.connections.values(), key=lambda conn: conn["id"]):
             state["connections"].append({
-                "from": self.get_box_text(conn["from"]),
-                "to": self.get_box_text(conn["to"])
+                "id": conn["id"],
+                "from": conn["from"]["id"],
+                "to": conn["to"]["id"]
             })
-        self.undo_stack.append(json.dumps(state))
-        self.redo_stack.clear()
-
+        return json.dumps(state)
+
+    # Ältere Dateien ohne IDs: Kästchen nach Reihenfolge nummerieren und
+    # Verbindungen wie bisher über den Text zuordnen
+    @staticmethod
+    def normalize_state(state):
+        boxes = state.setdefault("boxes", [])
+        connections = state.setdefault("connections", [])
+        if boxes and "id" not in boxes[0]:
+            by_text = {}
+            for index, box_data in enumerate(boxes):
+                box_data["id"] = index
+                by_text[box_data["text"]] = index
+            state["connections"] = connections = [
+                {"from": by_text[conn_data["from"]], "to": by_text[conn_data["to"]]}
+                for conn_data in connections
+                if conn_data["from"] in by_text and conn_data["to"] in by_text
+            ]
+        for index, conn_data in enumerate(connections):
+            conn_data.setdefault("id", index)
+        return state
+
+    # Zielzustand mit dem Canvas abgleichen und nur die Unterschiede anwenden;
+    # Kästchen und Verbindungen werden über ihre IDs zugeordnet. Jede Änderung
+    # wird als Befehl ausgeführt; zusammen ergeben sie einen Undo-Schritt.
     def load_state(self, state_json):
-        state = json.loads(state_json)
-        self.canvas.delete(tk.ALL)
-        self.boxes.clear()
-        self.connections.clear()
-        box_lookup = {}
+        state = self.normalize_state(json.loads(state_json))
+        targets = {box_data["id"]: box_data for box_data in state["boxes"]}
+        target_connections = {conn_data["id"]: conn_data for conn_data in state["connections"]
+                              if conn_data["from"] in targets and conn_data["to"] in targets}
+        commands = []
+
+        def run(command):
+            command.redo(self)
+            commands.append(command)
+
+        for conn in list(self.connections.values()):
+            conn_data = target_connections.get(conn["id"])
+            if (conn_data is None or conn_data["from"] != conn["from"]["id"]
+                    or conn_data["to"] != conn["to"]["id"]):
+                run(RemoveConnectionCommand(conn))
+
+        for box in list(self.boxes.values()):
+            if box["id"] not in targets:
+                run(RemoveBoxCommand(box, self.box_data(box), []))
+
+        moved = set()
+        for box in self.boxes.values():
+            box_data = targets[box["id"]]
+            left, top, _, _ = self.get_box_bounds(box)
+            dx, dy = box_data["x"] - left, box_data["y"] - top
+            if dx or dy:
+                self.canvas.move(box["rect"], dx, dy)
+                self.canvas.move(box["label"], dx, dy)
+                self.index_box(box)
+                commands.append(MoveBoxCommand(box, dx, dy))
+                moved.add(box["id"])
+            text = self.get_box_text(box)
+            if text != box_data["text"]:
+                run(ItemConfigCommand(box, "label", "text", text, box_data["text"]))
+            color = self.canvas.itemcget(box["rect"], "fill")
+            if color != box_data["color"]:
+                run(ItemConfigCommand(box, "rect", "fill", color, box_data["color"]))
+
         for box_data in state["boxes"]:
-            box = self.create_box(box_data["x"], box_data["y"], box_data["text"], box_data["color"])
-            box_lookup[box_data["text"]] = box
-        for conn_data in state["connections"]:
-            from_box = box_lookup.get(conn_data["from"])
-            to_box = box_lookup.get(conn_data["to"])
-            if from_box and to_box:
-                self.create_connection(from_box, to_box)
-        if self.selected_box:
-            text = self.get_box_text(self.selected_box)
-            for b in self.boxes:
-                if self.get_box_text(b) == text:
-                    self.select_box(b)
-                    break
+            if box_data["id"] not in self.boxes:
+                box = self.create_box(box_data["x"], box_data["y"], box_data["text"], box_data["color"],
+                                      select=False, box_id=box_data["id"])
+                commands.append(AddBoxCommand(box))
+
+        for conn_id, conn_data in target_connections.items():
+            if conn_id not in self.connections:
+                conn = self.create_connection(self.boxes[conn_data["from"]],
+                                              self.boxes[conn_data["to"]], conn_id)
+                commands.append(AddConnectionCommand(conn))
+
+        touched = {}
+        for box_id in moved:
+            touched.update(self.adjacency.get(box_id, {}))
+        for conn in touched.values():
+            self.update_connection(conn)
+        return MacroCommand(commands)
 
     def menu_undo(self):
-        if len(self.undo_stack) <= 1:
-            return
-        state = self.undo_stack.pop()
-        self.redo_stack.append(state)
-        prev_state = self.undo_stack[-1]
-        self.load_state(prev_state)
+        self.history.undo()
 
     def menu_redo(self):
-        if not self.redo_stack:
-            return
-        state = self.redo_stack.pop()
-        self.undo_stack.append(state)
-        self.load_state(state)
+        self.history.redo()
 
     # --- Menü-Funktionen ---
     def menu_new(self):
@@ -335,23 +796,29 @@ class DiagramEditor(tk.Tk):
             self.canvas.delete(tk.ALL)
             self.boxes.clear()
             self.connections.clear()
+            self.connection_by_line.clear()
+            self.adjacency.clear()
+            self.grid.clear()
+            self.box_cells.clear()
             self.selected_box = None
-            self.undo_stack.clear()
-            self.redo_stack.clear()
-            self.save_state()
+            self.selected_boxes = []
+            self.history.clear()
 
     def menu_add_box(self):
         x, y = 100 + len(self.boxes) * 20, 100 + len(self.boxes) * 20
         text = f"Kästchen {len(self.boxes) + 1}"
         color = "lightblue"
-        self.create_box(x, y, text, color)
+        box = self.create_box(x, y, text, color)
+        self.history.push(AddBoxCommand(box))
 
     def menu_add_box_with_template(self):
         def create_selected():
             index = combo.current()
             if index >= 0:
                 tpl = self.box_templates[index]
-                self.create_box_with_shape(100 + len(self.boxes) * 20, 100 + len(self.boxes) * 20, tpl)
+                box = self.create_box_with_shape(100 + len(self.boxes) * 20, 100 + len(self.boxes) * 20, tpl)
+                if box:
+                    self.history.push(AddBoxCommand(box))
             win.destroy()
 
         win = tk.Toplevel(self)
@@ -371,8 +838,7 @@ class DiagramEditor(tk.Tk):
             return
         new_text = simpledialog.askstring("Text ändern", "Neuer Text:")
         if new_text:
-            self.canvas.itemconfig(self.selected_box["label"], text=new_text)
-            self.save_state()
+            self.set_box_text(self.selected_box, new_text)
 
     def menu_change_color(self):
         if not self.selected_box:
@@ -380,8 +846,7 @@ class DiagramEditor(tk.Tk):
             return
         color = colorchooser.askcolor(title="Farbe wählen")[1]
         if color:
-            self.canvas.itemconfig(self.selected_box["rect"], fill=color)
-            self.save_state()
+            self.set_box_color(self.selected_box, color)
 
     def menu_change_shape(self):
         if not self.selected_box:
@@ -390,30 +855,11 @@ class DiagramEditor(tk.Tk):
 
         def apply_shape():
             shape_name = combo.get()
-            text = self.get_box_text(self.selected_box)
-            color = self.canvas.itemcget(self.selected_box["rect"], "fill")
-            x1, y1, x2, y2 = self.canvas.coords(self.selected_box["rect"])
-
-            self.canvas.delete(self.selected_box["rect"])
-            if shape_name == "rectangle":
-                new_shape = self.canvas.create_rectangle(x1, y1, x2, y2, fill=color, outline="black", width=5)
-            elif shape_name == "oval":
-                new_shape = self.canvas.create_oval(x1, y1, x2, y2, fill=color, outline="black", width=5)
-            elif shape_name == "diamond":
-                cx = (x1 + x2) / 2
-                cy = (y1 + y2) / 2
-                new_shape = self.canvas.create_polygon(
-                    cx, y1, x2, cy, cx, y2, x1, cy,
-                    fill=color, outline="black", width=5
-                )
-            else:
+            old_shape = self.box_shape(self.selected_box)
+            if not self.set_box_shape(self.selected_box, shape_name):
                 messagebox.showwarning("Fehler", f"Unbekannte Form: {shape_name}")
                 return
-
-            self.selected_box["rect"] = new_shape
-            self.select_box(self.selected_box)
-            self.update_connections()
-            self.save_state()
+            self.history.push(ShapeCommand(self.selected_box, old_shape, shape_name))
             win.destroy()
 
         win = tk.Toplevel(self)
@@ -438,7 +884,8 @@ class DiagramEditor(tk.Tk):
     def finish_connection(self, event):
         clicked_box = self.find_box_at(event.x, event.y)
         if clicked_box and clicked_box != self.connect_from_box:
-            self.create_connection(self.connect_from_box, clicked_box)
+            conn = self.create_connection(self.connect_from_box, clicked_box)
+            self.history.push(AddConnectionCommand(conn))
         self.connect_mode = False
         self.connect_from_box = None
         self.canvas.bind("<Button-1>", self.start_drag)
@@ -450,30 +897,39 @@ class DiagramEditor(tk.Tk):
     def _delete_connection_click(self, event):
         conn = self.find_connection_at(event.x, event.y)
         if conn:
-            self.canvas.delete(conn["line"])
-            self.connections.remove(conn)
-            self.save_state()
+            command = RemoveConnectionCommand(conn)
+            self.detach_connection(conn)
+            self.history.push(command)
         self.canvas.bind("<Button-1>", self.start_drag)
 
-    def delete_box(self, box):
-        to_remove = []
-        for conn in self.connections:
-            if conn["from"] == box or conn["to"] == box:
-                self.canvas.delete(conn["line"])
-                to_remove.append(conn)
+    # O(Grad): die Verbindungen kommen aus der Adjazenz, Kästchen und
+    # Verbindungen werden über ihre ID aus den Registern entfernt
+    def remove_box(self, box):
+        to_remove = list(self.adjacency.get(box["id"], {}).values())
         for conn in to_remove:
-            self.connections.remove(conn)
-        self.canvas.delete(box["rect"])
-        self.canvas.delete(box["label"])
-        self.boxes.remove(box)
+            self.detach_connection(conn)
+        data = self.detach_box(box)
+        return RemoveBoxCommand(box, data, to_remove)
+
+    def delete_box(self, box):
+        if box is None:
+            return
+        self.history.push(self.remove_box(box))
+        self.selected_box = None
+
+    def delete_selection(self):
+        boxes = self.selected_boxes
+        # Auswahl vorab leeren, sonst filtert detach_box sie für jedes Kästchen
+        self.selected_boxes = []
         self.selected_box = None
-        self.save_state()
+        if boxes:
+            self.history.push(MacroCommand([self.remove_box(box) for box in boxes]))
 
     def menu_save(self):
         file_path = filedialog.asksaveasfilename(defaultextension=".json", filetypes=[("JSON-Dateien", "*.json")])
         if not file_path:
             return
-        state = self.undo_stack[-1]
+        state = self.serialize_state()
         with open(file_path, "w") as f:
             f.write(state)
 
@@ -483,9 +939,10 @@ class DiagramEditor(tk.Tk):
             return
         with open(file_path, "r") as f:
             state = f.read()
-        self.undo_stack.append(state)
-        self.redo_stack.clear()
-        self.load_state(state)
+        command = self.load_state(state)
+        # Unveränderter Zustand: kein leerer Undo-Schritt, Redo bleibt erhalten
+        if command.commands:
+            self.history.push(command)
 
     def menu_save_png(self):
         file_path = filedialog.asksaveasfilename(defaultextension=".png", filetypes=[("PNG-Bilder", "*.png")])
@@ -1,20 +1,644 @@
 import sys
 import os
+import argparse
+import multiprocessing
 import json
+import csv
+import math
+import time
+import codecs
+import io
+import gzip
+import mmap
+import bisect
+import struct
+import zlib
+from array import array
+from collections import deque
+from xml.sax.saxutils import escape, quoteattr
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QGraphicsView, QGraphicsScene,
     QGraphicsRectItem, QGraphicsLineItem, QGraphicsTextItem,
     QFileDialog, QToolBar, QAction, QColorDialog, QInputDialog,
     QListWidget, QListWidgetItem, QDockWidget, QMessageBox, QMenu,
-    QTableWidget, QTableWidgetItem
+    QTableView, QHeaderView, QProgressDialog
 )
 from PyQt5.QtGui import (
     QBrush, QColor, QPen, QFont, QPainter, QImage, QTransform,
-    QPolygonF, QPixmap, QIcon, QPainterPath
+    QPolygonF, QPixmap, QIcon, QPainterPath, QLinearGradient, QGradient, QKeySequence,
+    QFontMetricsF, QPdfWriter, QPageSize, QPageLayout
+)
+from PyQt5.QtCore import (
+    Qt, QPointF, QRectF, QLineF, QPoint, QTimer, QAbstractTableModel, QModelIndex,
+    QRunnable, QThreadPool, QMarginsF
 )
-from PyQt5.QtCore import Qt, QPointF, QRectF, QPoint
 
 TEMPLATES_FILE = "templates.json"
+AUTOSAVE_FILE = "autosave.dgrm.gz"
+AUTOSAVE_INTERVAL_MS = 60000
+
+# Undo-Historie aus Änderungsbefehlen: geschätzter Speicherbedarf in Bytes
+# und Zeitfenster, in dem Verschiebungen derselben Knoten zusammengefasst werden
+UNDO_MEMORY_BUDGET = 1 << 20
+MOVE_MERGE_SECONDS = 1.0
+
+# Ab so vielen eingefügten oder entfernten Zeilen wird die Tabelle einmal
+# neu aufgebaut statt zeilenweise benachrichtigt
+TABLE_BULK_ROWS = 32
+
+# Maximale Dauer einer Ladeportion in Sekunden
+LOAD_TIME_SLICE = 0.03
+# Fehler beim Lesen beschädigter oder abgeschnittener Dateien (auch *.gz)
+LOAD_ERRORS = (ValueError, KeyError, IndexError, TypeError, EOFError, OSError)
+
+# Große *.dgrm-Dateien ansehen: Rand um den sichtbaren Bereich (Anteil der
+# Ansichtsgröße), Obergrenze gleichzeitig erzeugter Knoten, Größe des Pools
+LAZY_MARGIN = 0.5
+LAZY_MAX_NODES = 20000
+LAZY_POOL_SIZE = 2000
+
+# Zweifarbige Füllung: ein Verlaufspinsel mit harter Kante (ein Füll- und ein
+# Konturdurchgang) oder die alte Variante mit zwei geclippten Hälften
+FILL_GRADIENT = "gradient"
+FILL_CLIP = "clip"
+
+# Detailstufen beim Herauszoomen: unterhalb LOD_TEXT keine Beschriftungen,
+# unterhalb LOD_SHAPE Knoten als einfache Rechtecke und Kanten als Haarlinien
+LOD_TEXT = 0.5
+LOD_SHAPE = 0.25
+
+# Bildexport in Kacheln: Kantenlänge einer Kachel in Pixeln, Bildschirm-DPI
+# als Bezug für den Skalierungsfaktor
+EXPORT_TILE_SIZE = 1024
+EXPORT_BASE_DPI = 96
+
+# Mehrseitiger PDF-Export: Überlappung benachbarter Seiten (Szeneneinheiten)
+# und Seitenrand in Millimetern
+PDF_PAGE_OVERLAP = 40
+PDF_PAGE_MARGIN_MM = 10
+PDF_PAGE_FORMATS = [
+    ("A4 Hochformat", QPageSize.A4, QPageLayout.Portrait),
+    ("A4 Querformat", QPageSize.A4, QPageLayout.Landscape),
+    ("A3 Hochformat", QPageSize.A3, QPageLayout.Portrait),
+    ("A3 Querformat", QPageSize.A3, QPageLayout.Landscape),
+]
+
+# Formpfade werden pro (Form, Breite, Höhe) nur einmal erzeugt und von allen
+# gleich großen Knoten gemeinsam genutzt
+_SHAPE_PATH_CACHE = {}
+
+def build_shape_path(shape, w, h):
+    path = QPainterPath()
+    if shape == "rect":
+        path.addRect(QRectF(0, 0, w, h))
+    elif shape == "ellipse":
+        path.addEllipse(QRectF(0, 0, w, h))
+    elif shape == "diamond":
+        points = [QPointF(w/2, 0), QPointF(w, h/2), QPointF(w/2, h), QPointF(0, h/2)]
+        path.addPolygon(QPolygonF(points))
+    elif shape == "triangle":
+        points = [QPointF(w/2, 0), QPointF(w, h), QPointF(0, h)]
+        path.addPolygon(QPolygonF(points))
+    elif shape == "hexagon":
+        points = [
+            QPointF(w*0.25, 0),
+            QPointF(w*0.75, 0),
+            QPointF(w, h/2),
+            QPointF(w*0.75, h),
+            QPointF(w*0.25, h),
+            QPointF(0, h/2)
+        ]
+        path.addPolygon(QPolygonF(points))
+    return path
+
+_SPLIT_BRUSH_CACHE = {}
+
+def cached_split_brush(color1, color2):
+    key = (color1.rgba(), color2.rgba())
+    brush = _SPLIT_BRUSH_CACHE.get(key)
+    if brush is None:
+        # Koordinaten relativ zum Begrenzungsrechteck, daher für alle Größen gleich
+        gradient = QLinearGradient(0, 0, 0, 1)
+        gradient.setCoordinateMode(QGradient.ObjectBoundingMode)
+        gradient.setColorAt(0.0, color1)
+        gradient.setColorAt(0.5, color1)
+        gradient.setColorAt(0.500001, color2)
+        gradient.setColorAt(1.0, color2)
+        brush = QBrush(gradient)
+        _SPLIT_BRUSH_CACHE[key] = brush
+    return brush
+
+# Schreibt {"abschnitt": [datensatz, ...], ...} Datensatz für Datensatz, ohne
+# das ganze Dokument im Speicher aufzubauen. Mit indent entspricht die
+# Ausgabe json.dump(..., indent=indent), ohne indent ist sie kompakt.
+def write_json_stream(f, sections, indent=None):
+    if indent is None:
+        f.write("{")
+        for i, (key, records) in enumerate(sections):
+            f.write(("," if i else "") + json.dumps(key) + ":[")
+            for j, record in enumerate(records):
+                f.write(("," if j else "") + json.dumps(record, separators=(",", ":")))
+            f.write("]")
+        f.write("}")
+        return
+    pad1 = " " * indent
+    pad2 = pad1 * 2
+    f.write("{")
+    for i, (key, records) in enumerate(sections):
+        f.write(("," if i else "") + "\n" + pad1 + json.dumps(key) + ": [")
+        empty = True
+        for record in records:
+            text = json.dumps(record, indent=indent).replace("\n", "\n" + pad2)
+            f.write(("\n" if empty else ",\n") + pad2 + text)
+            empty = False
+        f.write("]" if empty else "\n" + pad1 + "]")
+    f.write("\n}")
+
+# Liest ein JSON-Dokument der Form {"abschnitt": [datensatz, ...], ...}
+# stückweise und liefert (abschnitt, datensatz)-Paare, ohne die ganze Datei
+# auf einmal zu parsen. Werte, die keine Liste sind, werden als ein Paar
+# (abschnitt, wert) geliefert.
+class JsonStreamReader:
+    def __init__(self, f, chunk_size=1 << 16):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.decoder = json.JSONDecoder()
+        self.text_decoder = codecs.getincrementaldecoder("utf-8")()
+        self.buf = ""
+        self.pos = 0
+        self.bytes_read = 0
+        self.eof = False
+
+    def _fill(self):
+        if self.eof:
+            return False
+        chunk = self.f.read(self.chunk_size)
+        self.bytes_read += len(chunk)
+        if not chunk:
+            self.eof = True
+        self.buf = self.buf[self.pos:] + self.text_decoder.decode(chunk, final=self.eof)
+        self.pos = 0
+        return True
+
+    def _peek(self):
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in " \t\r\n":
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                raise ValueError("Unerwartetes Dateiende")
+
+    def _expect(self, char):
+        if self._peek() != char:
+            raise ValueError(f"'{char}' erwartet an Position {self.bytes_read}")
+        self.pos += 1
+
+    def _value(self):
+        while True:
+            self._peek()
+            try:
+                value, end = self.decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            # Eine Zahl am Pufferende könnte abgeschnitten sein
+            if end == len(self.buf) and not self.eof:
+                self._fill()
+                continue
+            self.pos = end
+            return value
+
+    def records(self):
+        self._expect("{")
+        if self._peek() == "}":
+            return
+        while True:
+            key = self._value()
+            self._expect(":")
+            if self._peek() == "[":
+                self.pos += 1
+                if self._peek() == "]":
+                    self.pos += 1
+                else:
+                    while True:
+                        yield key, self._value()
+                        char = self._peek()
+                        self.pos += 1
+                        if char == "]":
+                            break
+                        if char != ",":
+                            raise ValueError(f"',' oder ']' erwartet an Position {self.bytes_read}")
+            else:
+                yield key, self._value()
+            char = self._peek()
+            self.pos += 1
+            if char == "}":
+                return
+            if char != ",":
+                raise ValueError(f"',' oder '}}' erwartet an Position {self.bytes_read}")
+
+# Kompaktes Binärformat (*.dgrm): Kopf, Texttabelle und spaltenweise
+# abgelegte Knoten-/Verbindungsdaten. Jeder Text kommt nur einmal vor,
+# Farben stehen als RGB-Ganzzahl, Formen als Aufzählungswert. Die Datensätze
+# entsprechen denen von NodeItem.to_dict()/EdgeItem.to_dict().
+BINARY_MAGIC = b"DGRM"
+BINARY_VERSION = 1
+BINARY_SHAPES = ["rect", "ellipse", "diamond", "triangle", "hexagon"]
+# (Schlüssel, array-Typcode, Kodierung)
+BINARY_NODE_COLUMNS = [
+    ("id", "q", None),
+    ("shape", "B", "shape"),
+    ("x", "d", None),
+    ("y", "d", None),
+    ("width", "d", None),
+    ("height", "d", None),
+    ("color1", "I", "color"),
+    ("color2", "I", "color"),
+    ("text1", "I", "text"),
+    ("text2", "I", "text")
+]
+BINARY_EDGE_COLUMNS = [
+    ("source", "q", None),
+    ("dest", "q", None),
+    ("style", "B", None),
+    ("label", "I", "text")
+]
+
+def binary_shape(value):
+    if value >= len(BINARY_SHAPES):
+        raise ValueError(f"Ungültige Datei: unbekannte Form {value}")
+    return BINARY_SHAPES[value]
+
+def _binary_write_array(f, typecode, values):
+    column = array(typecode, values)
+    if sys.byteorder == "big":
+        column.byteswap()
+    f.write(column.tobytes())
+
+def _binary_read_array(f, typecode, count):
+    column = array(typecode)
+    data = f.read(column.itemsize * count)
+    if len(data) != column.itemsize * count:
+        raise ValueError("Unerwartetes Dateiende")
+    column.frombytes(data)
+    if sys.byteorder == "big":
+        column.byteswap()
+    return column
+
+def write_diagram_binary(f, nodes, edges):
+    texts = {}
+
+    def encode(kind, value):
+        if kind == "shape":
+            return BINARY_SHAPES.index(value) if value in BINARY_SHAPES else 0
+        if kind == "color":
+            return int(value.lstrip("#")[-6:], 16)
+        if kind == "text":
+            return texts.setdefault(value, len(texts))
+        return value
+
+    sections = []
+    for records, spec in ((nodes, BINARY_NODE_COLUMNS), (edges, BINARY_EDGE_COLUMNS)):
+        columns = [array(typecode) for _, typecode, _ in spec]
+        count = 0
+        for record in records:
+            for column, (key, _, kind) in zip(columns, spec):
+                column.append(encode(kind, record[key]))
+            count += 1
+        sections.append((count, columns))
+
+    f.write(BINARY_MAGIC + struct.pack("<HI", BINARY_VERSION, len(texts)))
+    for text in texts:
+        data = text.encode("utf-8")
+        f.write(struct.pack("<I", len(data)) + data)
+    for count, columns in sections:
+        f.write(struct.pack("<I", count))
+        for column in columns:
+            _binary_write_array(f, column.typecode, column)
+
+class BinaryDiagramReader:
+    def __init__(self, f):
+        self.f = f
+        self.bytes_read = 0
+
+    def _read(self, size):
+        data = self.f.read(size)
+        if len(data) != size:
+            raise ValueError("Unerwartetes Dateiende")
+        self.bytes_read += size
+        return data
+
+    def _section(self, spec):
+        count, = struct.unpack("<I", self._read(4))
+        columns = []
+        for _, typecode, _ in spec:
+            column = _binary_read_array(self.f, typecode, count)
+            self.bytes_read += column.itemsize * count
+            columns.append(column)
+        return count, columns
+
+    def records(self):
+        magic = self._read(4)
+        if magic != BINARY_MAGIC:
+            raise ValueError("Keine Diagramm-Binärdatei")
+        version, text_count = struct.unpack("<HI", self._read(6))
+        if version != BINARY_VERSION:
+            raise ValueError(f"Nicht unterstützte Version {version}")
+        texts = []
+        for _ in range(text_count):
+            size, = struct.unpack("<I", self._read(4))
+            texts.append(self._read(size).decode("utf-8"))
+
+        def decode(kind, value):
+            if kind == "shape":
+                return binary_shape(value)
+            if kind == "color":
+                return f"#{value:06x}"
+            if kind == "text":
+                if value >= len(texts):
+                    raise ValueError(f"Ungültige Datei: Textindex {value} außerhalb der Texttabelle")
+                return texts[value]
+            return value
+
+        for key, spec in (("nodes", BINARY_NODE_COLUMNS), ("edges", BINARY_EDGE_COLUMNS)):
+            count, columns = self._section(spec)
+            for i in range(count):
+                yield key, {name: decode(kind, column[i])
+                            for column, (name, _, kind) in zip(columns, spec)}
+
+# Tabellenexport direkt aus den Knoten-/Verbindungsregistern der Szene.
+# CSV/TSV und JSON Lines werden zeilenweise gestreamt; das Spaltenformat
+# (*.dtab) speichert jede Spalte wörterbuchkodiert: die verschiedenen Werte
+# einmal, dazu ein Index pro Zeile
+TABLE_MAGIC = b"DTAB"
+TABLE_VERSION = 1
+
+def write_table_csv(f, header, rows, delimiter=","):
+    writer = csv.writer(f, delimiter=delimiter)
+    writer.writerow(header)
+    writer.writerows(rows)
+
+def write_table_jsonl(f, header, rows):
+    for row in rows:
+        f.write(json.dumps(dict(zip(header, row)), ensure_ascii=False))
+        f.write("\n")
+
+def write_table_columnar(f, header, rows):
+    values = [{} for _ in header]
+    codes = [array("I") for _ in header]
+    count = 0
+    for row in rows:
+        for value, mapping, column in zip(row, values, codes):
+            column.append(mapping.setdefault(value, len(mapping)))
+        count += 1
+    f.write(TABLE_MAGIC + struct.pack("<HII", TABLE_VERSION, len(header), count))
+    for name, mapping, column in zip(header, values, codes):
+        f.write(struct.pack("<I", len(mapping)))
+        for text in (name, *mapping):
+            data = text.encode("utf-8")
+            f.write(struct.pack("<I", len(data)) + data)
+        _binary_write_array(f, "I", column)
+
+def read_table_columnar(f):
+    def read(size):
+        data = f.read(size)
+        if len(data) != size:
+            raise ValueError("Unerwartetes Dateiende")
+        return data
+
+    def read_text():
+        size, = struct.unpack("<I", read(4))
+        return read(size).decode("utf-8")
+
+    if f.read(4) != TABLE_MAGIC:
+        raise ValueError("Keine Tabellendatei")
+    version, column_count, count = struct.unpack("<HII", read(10))
+    if version != TABLE_VERSION:
+        raise ValueError(f"Nicht unterstützte Version {version}")
+
+    header = []
+    columns = []
+    for _ in range(column_count):
+        distinct, = struct.unpack("<I", read(4))
+        header.append(read_text())
+        mapping = [read_text() for _ in range(distinct)]
+        codes = _binary_read_array(f, "I", count)
+        if codes and max(codes) >= distinct:
+            raise ValueError(f"Ungültige Datei: Wertindex {max(codes)} außerhalb der Wertetabelle")
+        columns.append([mapping[code] for code in codes])
+    return header, columns
+
+# Dateiendung -> (Schreibfunktion, Binärmodus)
+TABLE_FORMATS = {
+    ".csv": (write_table_csv, False),
+    ".tsv": (lambda f, header, rows: write_table_csv(f, header, rows, "\t"), False),
+    ".jsonl": (write_table_jsonl, False),
+    ".dtab": (write_table_columnar, True),
+}
+
+# Speicherabgebildetes *.dgrm-Dokument: die Spalten bleiben in der Datei und
+# werden über memoryviews gelesen, Texte erst beim Zugriff dekodiert. Ein
+# gleichmäßiges Raster über den Knotenrechtecken beantwortet Bereichsabfragen.
+class MappedDiagram:
+    def __init__(self, path, cell_size=512.0):
+        self.file = open(path, "rb")
+        self.mm = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.cell_size = cell_size
+        if self.mm[:4] != BINARY_MAGIC:
+            self.close()
+            raise ValueError("Keine Diagramm-Binärdatei")
+        version, text_count = struct.unpack_from("<HI", self.mm, 4)
+        if version != BINARY_VERSION:
+            self.close()
+            raise ValueError(f"Nicht unterstützte Version {version}")
+        pos = 10
+        self.text_offsets = array("Q")
+        try:
+            for _ in range(text_count):
+                self.text_offsets.append(pos)
+                size, = self._unpack("<I", pos)
+                pos += 4 + size
+            self.node_count, self.node_columns, pos = self._map_section(pos, BINARY_NODE_COLUMNS)
+            self.edge_count, self.edge_columns, pos = self._map_section(pos, BINARY_EDGE_COLUMNS)
+            self._validate_columns()
+        except ValueError:
+            self.close()
+            raise
+        self._build_id_lookup()
+        self._build_adjacency()
+        self._build_grid()
+
+    def _unpack(self, fmt, pos):
+        if pos + struct.calcsize(fmt) > len(self.mm):
+            raise ValueError("Ungültige Datei: unerwartetes Dateiende")
+        return struct.unpack_from(fmt, self.mm, pos)
+
+    def _map_section(self, pos, spec):
+        count, = self._unpack("<I", pos)
+        pos += 4
+        # Länge vor dem Anlegen der memoryviews prüfen, sonst ließe sich das
+        # mmap nach dem Fehler nicht mehr schließen
+        if pos + sum(array(typecode).itemsize for _, typecode, _ in spec) * count > len(self.mm):
+            raise ValueError("Ungültige Datei: unerwartetes Dateiende")
+        columns = {}
+        for key, typecode, kind in spec:
+            size = array(typecode).itemsize * count
+            if sys.byteorder == "little":
+                columns[key] = memoryview(self.mm)[pos:pos + size].cast(typecode)
+            else:
+                columns[key] = _binary_read_array(io.BytesIO(self.mm[pos:pos + size]), typecode, count)
+            pos += size
+        return count, columns, pos
+
+    # Aufzählungswerte und Textindizes einmal beim Öffnen prüfen, damit
+    # node_record()/edge_record() beim Scrollen nicht mehr scheitern können
+    def _validate_columns(self):
+        for columns, spec in ((self.node_columns, BINARY_NODE_COLUMNS), (self.edge_columns, BINARY_EDGE_COLUMNS)):
+            for key, _, kind in spec:
+                if not len(columns[key]):
+                    continue
+                if kind == "shape":
+                    binary_shape(max(columns[key]))
+                elif kind == "text" and max(columns[key]) >= len(self.text_offsets):
+                    raise ValueError(f"Ungültige Datei: Textindex {max(columns[key])} außerhalb der Texttabelle")
+
+    def _build_id_lookup(self):
+        ids = self.node_columns["id"]
+        self.ids_sorted = all(ids[i] < ids[i + 1] for i in range(len(ids) - 1))
+        self.index_of_id = None if self.ids_sorted else {node_id: i for i, node_id in enumerate(ids)}
+
+    def node_index(self, node_id):
+        if self.index_of_id is not None:
+            return self.index_of_id.get(node_id, -1)
+        ids = self.node_columns["id"]
+        i = bisect.bisect_left(ids, node_id)
+        return i if i < len(ids) and ids[i] == node_id else -1
+
+    def _build_adjacency(self):
+        # Inzidente Verbindungen je Knoten als CSR-Arrays (Offsets + Indizes)
+        self.edge_source = array("q", (self.node_index(i) for i in self.edge_columns["source"]))
+        self.edge_dest = array("q", (self.node_index(i) for i in self.edge_columns["dest"]))
+        degree = array("I", bytes(4 * (self.node_count + 1)))
+        for i in (*self.edge_source, *self.edge_dest):
+            if i >= 0:
+                degree[i + 1] += 1
+        for i in range(self.node_count):
+            degree[i + 1] += degree[i]
+        self.adjacency_offsets = degree
+        self.adjacency = array("I", bytes(4 * degree[self.node_count]))
+        fill = array("I", degree[:-1])
+        for edge, (s, d) in enumerate(zip(self.edge_source, self.edge_dest)):
+            for i in (s, d):
+                if i >= 0:
+                    self.adjacency[fill[i]] = edge
+                    fill[i] += 1
+
+    def _build_grid(self):
+        self.grid = {}
+        cs = self.cell_size
+        xs, ys = self.node_columns["x"], self.node_columns["y"]
+        ws, hs = self.node_columns["width"], self.node_columns["height"]
+        for i in range(self.node_count):
+            for cx in range(int(xs[i] // cs), int((xs[i] + ws[i]) // cs) + 1):
+                for cy in range(int(ys[i] // cs), int((ys[i] + hs[i]) // cs) + 1):
+                    cell = self.grid.get((cx, cy))
+                    if cell is None:
+                        cell = self.grid[(cx, cy)] = array("I")
+                    cell.append(i)
+
+    def bounds(self):
+        if not self.node_count:
+            return 0.0, 0.0, 0.0, 0.0
+        xs, ys = self.node_columns["x"], self.node_columns["y"]
+        ws, hs = self.node_columns["width"], self.node_columns["height"]
+        return (min(xs), min(ys),
+                max(xs[i] + ws[i] for i in range(self.node_count)),
+                max(ys[i] + hs[i] for i in range(self.node_count)))
+
+    def query(self, x1, y1, x2, y2, limit=None):
+        cs = self.cell_size
+        cx1, cx2 = int(x1 // cs), int(x2 // cs)
+        cy1, cy2 = int(y1 // cs), int(y2 // cs)
+        if (cx2 - cx1 + 1) * (cy2 - cy1 + 1) > len(self.grid):
+            cells = [c for key, c in self.grid.items()
+                     if cx1 <= key[0] <= cx2 and cy1 <= key[1] <= cy2]
+        else:
+            cells = [self.grid[key] for key in
+                     ((cx, cy) for cx in range(cx1, cx2 + 1) for cy in range(cy1, cy2 + 1))
+                     if key in self.grid]
+        xs, ys = self.node_columns["x"], self.node_columns["y"]
+        ws, hs = self.node_columns["width"], self.node_columns["height"]
+        found = set()
+        for cell in cells:
+            for i in cell:
+                if i not in found and xs[i] <= x2 and ys[i] <= y2 and xs[i] + ws[i] >= x1 and ys[i] + hs[i] >= y1:
+                    found.add(i)
+                    if limit is not None and len(found) >= limit:
+                        return found
+        return found
+
+    def incident_edges(self, i):
+        return self.adjacency[self.adjacency_offsets[i]:self.adjacency_offsets[i + 1]]
+
+    def text(self, i):
+        pos = self.text_offsets[i]
+        size, = struct.unpack_from("<I", self.mm, pos)
+        return self.mm[pos + 4:pos + 4 + size].decode("utf-8")
+
+    def _record(self, columns, spec, i):
+        record = {}
+        for key, _, kind in spec:
+            value = columns[key][i]
+            if kind == "shape":
+                value = BINARY_SHAPES[value]
+            elif kind == "color":
+                value = f"#{value:06x}"
+            elif kind == "text":
+                value = self.text(value)
+            record[key] = value
+        return record
+
+    def node_record(self, i):
+        return self._record(self.node_columns, BINARY_NODE_COLUMNS, i)
+
+    def edge_record(self, i):
+        return self._record(self.edge_columns, BINARY_EDGE_COLUMNS, i)
+
+    def close(self):
+        # memoryviews müssen vor dem mmap freigegeben werden
+        for columns in (getattr(self, "node_columns", {}), getattr(self, "edge_columns", {})):
+            for column in columns.values():
+                if isinstance(column, memoryview):
+                    column.release()
+        self.mm.close()
+        self.file.close()
+
+def diagram_reader(f):
+    # Format am Dateianfang erkennen, f muss im Binärmodus geöffnet sein
+    magic = f.read(len(BINARY_MAGIC))
+    f.seek(0)
+    if magic == BINARY_MAGIC:
+        return BinaryDiagramReader(f)
+    if magic[:2] == b"\x1f\x8b":
+        return diagram_reader(gzip.GzipFile(fileobj=f))
+    return JsonStreamReader(f)
+
+def cached_shape_path(shape, w, h):
+    key = (shape, w, h)
+    path = _SHAPE_PATH_CACHE.get(key)
+    if path is None:
+        path = build_shape_path(shape, w, h)
+        _SHAPE_PATH_CACHE[key] = path
+    return path
+
+class LodTextItem(QGraphicsTextItem):
+    def paint(self, painter, option, widget):
+        if option.levelOfDetailFromTransform(painter.worldTransform()) < LOD_TEXT:
+            return
+        super().paint(painter, option, widget)
 
 class NodeItem(QGraphicsRectItem):
     def __init__(self, shape="rect", rect=QRectF(0, 0, 100, 60), text1="Node", text2="", color1=QColor("lightgray"), color2=QColor("white")):
@@ -29,17 +653,21 @@ class NodeItem(QGraphicsRectItem):
         self.color2 = color2
         self.pen = QPen(Qt.black)
         self.setPen(self.pen)
+        self._path = None
+        self._layout_dirty = False
+        self.edges = set()
+        self.node_id = None
 
         self.text1 = text1
         self.text2 = text2
 
-        self.text_item1 = QGraphicsTextItem(text1, self)
+        self.text_item1 = LodTextItem(text1, self)
         self.text_item1.setDefaultTextColor(Qt.black)
         font1 = QFont()
         font1.setPointSize(10)
         self.text_item1.setFont(font1)
 
-        self.text_item2 = QGraphicsTextItem(text2, self)
+        self.text_item2 = LodTextItem(text2, self)
         self.text_item2.setDefaultTextColor(Qt.black)
         font2 = QFont()
         font2.setPointSize(8)
@@ -58,40 +686,100 @@ class NodeItem(QGraphicsRectItem):
         y2 = y1 + text1_rect.height()
         self.text_item2.setPos(x2, y2)
 
+    # Textlayout nur nach Änderungen an Text, Schrift oder Rechteck neu
+    # berechnen, gesammelt im nächsten Durchlauf der Event-Loop
+    def invalidate_layout(self):
+        if not self._layout_dirty:
+            self._layout_dirty = True
+            QTimer.singleShot(0, self.layout_texts)
+
+    def layout_texts(self):
+        if not self._layout_dirty:
+            return
+        self._layout_dirty = False
+        self.center_texts()
+
+    def set_texts(self, text1, text2):
+        self.text1 = text1
+        self.text2 = text2
+        self.text_item1.setPlainText(text1)
+        self.text_item2.setPlainText(text2)
+        self.invalidate_layout()
+        self.mark_changed()
+
+    def set_fonts(self, font1, font2):
+        self.text_item1.setFont(font1)
+        self.text_item2.setFont(font2)
+        self.invalidate_layout()
+
+    def set_colors(self, color1, color2):
+        self.color1 = color1
+        self.color2 = color2
+        self.update()
+        self.mark_changed()
+
+    def set_shape(self, shape):
+        self.shape = shape
+        self._path = None
+        self.update()
+        self.mark_changed()
+
+    def setRect(self, *args):
+        super().setRect(*args)
+        self._path = None
+        self.invalidate_layout()
+        self.update_edges()
+        self.mark_changed()
+
+    def add_edge(self, edge):
+        self.edges.add(edge)
+
+    def remove_edge(self, edge):
+        self.edges.discard(edge)
+
+    def update_edges(self):
+        for edge in self.edges:
+            edge.update_position()
+
+    def itemChange(self, change, value):
+        if change == QGraphicsRectItem.ItemPositionHasChanged:
+            self.update_edges()
+            self.mark_changed()
+        return super().itemChange(change, value)
+
+    def mark_changed(self):
+        scene = self.scene()
+        if scene is not None and hasattr(scene, "snapshot_changed"):
+            scene.snapshot_changed(self)
+
+    # Für die automatische Sicherung: Zustand als einfaches Tupel in der
+    # Spaltenreihenfolge von BINARY_NODE_COLUMNS
+    def snapshot(self):
+        r = self.rect()
+        return (self.node_id, self.shape, self.pos().x(), self.pos().y(),
+                r.width(), r.height(), self.color1.name(), self.color2.name(),
+                self.text1, self.text2)
+
+    def shape_path(self):
+        if self._path is None:
+            r = self.rect()
+            self._path = cached_shape_path(self.shape, r.width(), r.height())
+            if r.x() or r.y():
+                self._path = self._path.translated(r.x(), r.y())
+        return self._path
+
     def paint(self, painter, option, widget):
         r = self.rect()
-        path = QPainterPath()
-        if self.shape == "rect":
-            path.addRect(r)
-        elif self.shape == "ellipse":
-            path.addEllipse(r)
-        elif self.shape == "diamond":
-            points = [
-                QPointF(r.x() + r.width()/2, r.y()),
-                QPointF(r.x() + r.width(), r.y() + r.height()/2),
-                QPointF(r.x() + r.width()/2, r.y() + r.height()),
-                QPointF(r.x(), r.y() + r.height()/2)
-            ]
-            path.addPolygon(QPolygonF(points))
-        elif self.shape == "triangle":
-            points = [
-                QPointF(r.x() + r.width()/2, r.y()),
-                QPointF(r.x() + r.width(), r.y() + r.height()),
-                QPointF(r.x(), r.y() + r.height())
-            ]
-            path.addPolygon(QPolygonF(points))
-        elif self.shape == "hexagon":
-            w, h = r.width(), r.height()
-            x, y = r.x(), r.y()
-            points = [
-                QPointF(x + w*0.25, y),
-                QPointF(x + w*0.75, y),
-                QPointF(x + w, y + h/2),
-                QPointF(x + w*0.75, y + h),
-                QPointF(x + w*0.25, y + h),
-                QPointF(x, y + h/2)
-            ]
-            path.addPolygon(QPolygonF(points))
+        if option.levelOfDetailFromTransform(painter.worldTransform()) < LOD_SHAPE:
+            painter.fillRect(r, self.color1)
+            return
+        path = self.shape_path()
+        scene = self.scene()
+        if getattr(scene, "fill_mode", FILL_GRADIENT) == FILL_GRADIENT:
+            painter.setPen(self.pen)
+            painter.setBrush(cached_split_brush(self.color1, self.color2))
+            painter.drawPath(path)
+            return
         # Top half
         painter.save()
         painter.setBrush(QBrush(self.color1))
@@ -109,7 +797,40 @@ class NodeItem(QGraphicsRectItem):
         # Outline
         painter.setPen(self.pen)
         painter.drawPath(path)
-        self.center_texts()
+
+    @staticmethod
+    def from_dict(data):
+        node = NodeItem(
+            shape=data.get("shape", "rect"),
+            rect=QRectF(0, 0, data.get("width", 100), data.get("height", 60)),
+            text1=data.get("text1", ""),
+            text2=data.get("text2", ""),
+            color1=QColor(data.get("color1", "lightgray")),
+            color2=QColor(data.get("color2", "white"))
+        )
+        node.setPos(data.get("x", 0), data.get("y", 0))
+        return node
+
+    def apply_dict(self, data):
+        self.set_shape(data.get("shape", "rect"))
+        self.setRect(0, 0, data.get("width", 100), data.get("height", 60))
+        self.set_colors(QColor(data.get("color1", "lightgray")), QColor(data.get("color2", "white")))
+        self.set_texts(data.get("text1", ""), data.get("text2", ""))
+        self.setPos(data.get("x", 0), data.get("y", 0))
+
+    def to_dict(self):
+        return {
+            "id": self.node_id,
+            "shape": self.shape,
+            "color1": self.color1.name(),
+            "color2": self.color2.name(),
+            "x": self.pos().x(),
+            "y": self.pos().y(),
+            "width": self.rect().width(),
+            "height": self.rect().height(),
+            "text1": self.text1,
+            "text2": self.text2
+        }
 
     def contextMenuEvent(self, event):
         menu = QMenu()
@@ -118,19 +839,20 @@ class NodeItem(QGraphicsRectItem):
         connect_node = menu.addAction("Verbinden")
         edit_text = menu.addAction("Text bearbeiten")
         delete_node = menu.addAction("Löschen")
-        action = menu.exec_(event.screenPos())
         scene = self.scene()
+        if scene is None or getattr(scene, "read_only", False):
+            return
+        before = self.to_dict()
+        action = menu.exec_(event.screenPos())
         if action == change_color and scene:
             col1 = QColorDialog.getColor(self.color1)
             if col1.isValid():
                 col2 = QColorDialog.getColor(self.color2)
                 if not col2.isValid():
                     col2 = col1
-                self.color1 = col1
-                self.color2 = col2
-                self.update()
-                if hasattr(scene, 'parent'):
-                    scene.parent.update_table()
+                self.set_colors(col1, col2)
+                scene.item_changed(self)
+                scene.history.push(NodeChangeCommand(self, before, self.to_dict()))
         elif action == change_shape and scene:
             shapes = ["Rechteck", "Ellipse", "Raute", "Dreieck", "Hexagon"]
             idx, ok = QInputDialog.getItem(None, "Form wählen", "Form:", shapes, 0, False)
@@ -142,10 +864,9 @@ class NodeItem(QGraphicsRectItem):
                     "Dreieck": "triangle",
                     "Hexagon": "hexagon"
                 }
-                self.shape = mapping[idx]
-                self.update()
-                if hasattr(scene, 'parent'):
-                    scene.parent.update_table()
+                self.set_shape(mapping[idx])
+                scene.item_changed(self)
+                scene.history.push(NodeChangeCommand(self, before, self.to_dict()))
         elif action == connect_node and scene:
             scene.connecting = True
             scene.connect_source = self
@@ -154,24 +875,14 @@ class NodeItem(QGraphicsRectItem):
             if ok1:
                 text2, ok2 = QInputDialog.getText(None, "Sekundärer Text", "Textzeile 2:", text=self.text2)
                 if ok2:
-                    self.text1 = text1
-                    self.text2 = text2
-                    self.text_item1.setPlainText(text1)
-                    self.text_item2.setPlainText(text2)
-                    self.center_texts()
-                    if hasattr(scene, 'parent'):
-                        scene.parent.update_table()
+                    self.set_texts(text1, text2)
+                    scene.item_changed(self)
+                    scene.history.push(NodeChangeCommand(self, before, self.to_dict()))
         elif action == delete_node and scene:
-            for edge in list(scene.items()):
-                if isinstance(edge, EdgeItem) and (edge.source == self or edge.dest == self):
-                    scene.removeItem(edge)
-                    if edge in scene.edges:
-                        scene.edges.remove(edge)
-            scene.removeItem(self)
-            if self in scene.nodes:
-                scene.nodes.remove(self)
-            if hasattr(scene, 'parent'):
-                scene.parent.update_table()
+            if self.isSelected():
+                scene.delete_selection()
+            else:
+                scene.delete_items([self], [])
         super().contextMenuEvent(event)
 
 class EdgeItem(QGraphicsLineItem):
@@ -183,14 +894,36 @@ class EdgeItem(QGraphicsLineItem):
         self.pen.setStyle(line_style)
         self.setPen(self.pen)
         self.label_text = label_text
-        self.text_item = QGraphicsTextItem(label_text, self)
+        self.text_item = LodTextItem(label_text, self)
         self.text_item.setDefaultTextColor(Qt.black)
         font = QFont()
         font.setPointSize(8)
         self.text_item.setFont(font)
+        self.source.add_edge(self)
+        self.dest.add_edge(self)
         self.update_position()
         self.setZValue(-1)
 
+    def detach(self):
+        self.source.remove_edge(self)
+        self.dest.remove_edge(self)
+
+    def attach(self):
+        self.source.add_edge(self)
+        self.dest.add_edge(self)
+        self.update_position()
+
+    def set_label(self, text):
+        self.label_text = text
+        self.text_item.setPlainText(text)
+        self.update_position()
+        scene = self.scene()
+        if scene is not None and hasattr(scene, "snapshot_changed"):
+            scene.snapshot_changed(self)
+
+    def snapshot(self):
+        return (self.source.node_id, self.dest.node_id, int(self.pen.style()), self.label_text)
+
     def update_position(self):
         src_c = self.source.sceneBoundingRect().center()
         dest_c = self.dest.sceneBoundingRect().center()
@@ -202,40 +935,564 @@ class EdgeItem(QGraphicsLineItem):
                               my - self.text_item.boundingRect().height()/2)
 
     def paint(self, painter, option, widget):
-        self.update_position()
-        painter.setPen(self.pen)
+        if option.levelOfDetailFromTransform(painter.worldTransform()) < LOD_SHAPE:
+            painter.setPen(QPen(self.pen.color(), 0))
+        else:
+            painter.setPen(self.pen)
         painter.drawLine(self.line())
 
+    @staticmethod
+    def from_dict(data, nodes_by_id):
+        src = nodes_by_id[data.get("source")]
+        dest = nodes_by_id[data.get("dest")]
+        return EdgeItem(src, dest, data.get("style", Qt.SolidLine), data.get("label", ""))
+
+    def to_dict(self):
+        return {
+            "source": self.source.node_id,
+            "dest": self.dest.node_id,
+            "style": self.pen.style(),
+            "label": self.label_text
+        }
+
     def contextMenuEvent(self, event):
         menu = QMenu()
         edit_label = menu.addAction("Text bearbeiten")
         delete_edge = menu.addAction("Verbindung löschen")
-        action = menu.exec_(event.screenPos())
         scene = self.scene()
+        if scene is None or getattr(scene, "read_only", False):
+            return
+        action = menu.exec_(event.screenPos())
         if action == edit_label and scene:
             text, ok = QInputDialog.getText(None, "Verbindungstext", "Text für Verbindung:", text=self.label_text)
             if ok:
-                self.label_text = text
-                self.text_item.setPlainText(text)
-                self.update_position()
-                if hasattr(scene, 'parent'):
-                    scene.parent.update_table()
+                old = self.label_text
+                self.set_label(text)
+                scene.item_changed(self)
+                scene.history.push(EdgeLabelCommand(self, old, text))
         elif action == delete_edge and scene:
-            scene.removeItem(self)
-            if self in scene.edges:
-                scene.edges.remove(self)
-            if hasattr(scene, 'parent'):
-                scene.parent.update_table()
+            scene.delete_items([], [self])
         super().contextMenuEvent(event)
 
+# Tabellenmodell direkt über den Knoten/Verbindungen der Szene: Änderungen
+# melden nur die betroffenen Zeilen, die Ansicht zeichnet nur sichtbare Zeilen
+class DiagramTableModel(QAbstractTableModel):
+    HEADERS = ["Text1", "Text2", "Form/Verbindung", "Farbe1/Farbe2"]
+    STYLE_NAMES = {
+        Qt.SolidLine: "Durchgezogen",
+        Qt.DashLine: "Gestrichelt",
+        Qt.DotLine: "Gepunktet"
+    }
+
+    def __init__(self, scene):
+        super().__init__(scene)
+        self.scene = scene
+        self.node_rows = []
+        self.edge_rows = []
+        self._row_of = None
+        self.suspended = False
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.node_rows) + len(self.edge_rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.HEADERS[section]
+        return super().headerData(section, orientation, role)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or role != Qt.DisplayRole:
+            return None
+        return self.cell_text(self.item_at(index.row()), index.column())
+
+    def item_at(self, row):
+        if row < len(self.node_rows):
+            return self.node_rows[row]
+        return self.edge_rows[row - len(self.node_rows)]
+
+    def row_of(self, item):
+        if self._row_of is None:
+            self._row_of = {}
+            for row, node in enumerate(self.node_rows):
+                self._row_of[node] = row
+            offset = len(self.node_rows)
+            for row, edge in enumerate(self.edge_rows):
+                self._row_of[edge] = offset + row
+        return self._row_of.get(item)
+
+    def cell_text(self, item, column):
+        if isinstance(item, NodeItem):
+            if column == 0:
+                return item.text1
+            if column == 1:
+                return item.text2
+            if column == 2:
+                return item.shape
+            return f"{item.color1.name()}/{item.color2.name()}"
+        if column == 0:
+            return "Verbindung"
+        if column == 1:
+            return f"{item.source.text1} → {item.dest.text1}"
+        if column == 2:
+            return self.STYLE_NAMES.get(item.pen.style(), "Durchgezogen")
+        return item.label_text
+
+    def node_added(self, node):
+        if self.suspended:
+            return
+        row = len(self.node_rows)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self.node_rows.append(node)
+        self._row_of = None
+        self.endInsertRows()
+
+    def edge_added(self, edge):
+        if self.suspended:
+            return
+        row = self.rowCount()
+        self.beginInsertRows(QModelIndex(), row, row)
+        self.edge_rows.append(edge)
+        if self._row_of is not None:
+            self._row_of[edge] = row
+        self.endInsertRows()
+
+    def item_removed(self, item):
+        if self.suspended:
+            return
+        row = self.row_of(item)
+        if row is None:
+            return
+        self.beginRemoveRows(QModelIndex(), row, row)
+        if row < len(self.node_rows):
+            del self.node_rows[row]
+        else:
+            del self.edge_rows[row - len(self.node_rows)]
+        self._row_of = None
+        self.endRemoveRows()
+
+    def item_changed(self, item):
+        if self.suspended:
+            return
+        self.row_changed(item)
+        # Verbindungszeilen zeigen den Text ihrer Endknoten
+        if isinstance(item, NodeItem):
+            for edge in item.edges:
+                self.row_changed(edge)
+
+    def row_changed(self, item):
+        row = self.row_of(item)
+        if row is not None:
+            self.dataChanged.emit(self.index(row, 0), self.index(row, len(self.HEADERS) - 1))
+
+    # Für Massenänderungen (Laden, Mehrfachlöschen) Einzelmeldungen aussetzen
+    # und danach einmal komplett neu aufbauen
+    def suspend(self):
+        self.suspended = True
+
+    def resume(self):
+        self.suspended = False
+        self.reset()
+
+    def reset(self):
+        self.beginResetModel()
+        self.node_rows = list(self.scene.nodes)
+        self.edge_rows = list(self.scene.edges)
+        self._row_of = None
+        self.endResetModel()
+
+# Befehle speichern nur die Änderung, nicht den Gesamtzustand; entfernte
+# Knoten und Verbindungen werden als dieselben Objekte wieder eingefügt
+class Command:
+    cost = 64
+
+    def undo(self, scene):
+        raise NotImplementedError
+
+    def redo(self, scene):
+        raise NotImplementedError
+
+    def merge(self, other):
+        return False
+
+class MoveNodesCommand(Command):
+    def __init__(self, moves):
+        self.moves = moves
+        self.time = time.monotonic()
+        self.cost = 64 + 48 * len(moves)
+
+    def undo(self, scene):
+        for node, (old, _) in self.moves.items():
+            node.setPos(old)
+
+    def redo(self, scene):
+        for node, (_, new) in self.moves.items():
+            node.setPos(new)
+
+    def merge(self, other):
+        if (isinstance(other, MoveNodesCommand) and other.moves.keys() == self.moves.keys()
+                and other.time - self.time <= MOVE_MERGE_SECONDS):
+            for node, (_, new) in other.moves.items():
+                self.moves[node] = (self.moves[node][0], new)
+            self.time = other.time
+            return True
+        return False
+
+# Farbe, Form oder Text eines Knotens: nur die geänderten Felder aus to_dict
+class NodeChangeCommand(Command):
+    def __init__(self, node, before, after):
+        self.node = node
+        self.changes = {key: (before.get(key), value) for key, value in after.items()
+                        if before.get(key) != value}
+        self.cost = 64 + sum(len(str(old)) + len(str(new)) for old, new in self.changes.values())
+
+    def apply(self, scene, index):
+        data = self.node.to_dict()
+        data.update((key, values[index]) for key, values in self.changes.items())
+        self.node.apply_dict(data)
+        scene.item_changed(self.node)
+
+    def undo(self, scene):
+        self.apply(scene, 0)
+
+    def redo(self, scene):
+        self.apply(scene, 1)
+
+class EdgeLabelCommand(Command):
+    def __init__(self, edge, old, new):
+        self.edge = edge
+        self.old = old
+        self.new = new
+        self.cost = 64 + len(old) + len(new)
+
+    def undo(self, scene):
+        self.edge.set_label(self.old)
+        scene.item_changed(self.edge)
+
+    def redo(self, scene):
+        self.edge.set_label(self.new)
+        scene.item_changed(self.edge)
+
+class AddItemsCommand(Command):
+    def __init__(self, nodes=(), edges=()):
+        self.nodes = list(nodes)
+        self.edges = list(edges)
+        self.cost = 64 + 256 * len(self.nodes) + 128 * len(self.edges)
+
+    def undo(self, scene):
+        scene.remove_items(self.nodes, self.edges)
+
+    def redo(self, scene):
+        scene.restore_items(self.nodes, self.edges)
+
+class RemoveItemsCommand(AddItemsCommand):
+    def undo(self, scene):
+        super().redo(scene)
+
+    def redo(self, scene):
+        super().undo(scene)
+
+class UndoHistory:
+    def __init__(self, scene, budget=UNDO_MEMORY_BUDGET):
+        self.scene = scene
+        self.budget = budget
+        self.undo_stack = deque()
+        self.redo_stack = []
+        self.cost = 0
+
+    def push(self, command):
+        self.redo_stack.clear()
+        if self.undo_stack and self.undo_stack[-1].merge(command):
+            return
+        self.undo_stack.append(command)
+        self.cost += command.cost
+        while self.cost > self.budget and len(self.undo_stack) > 1:
+            self.cost -= self.undo_stack.popleft().cost
+
+    def undo(self):
+        if not self.undo_stack:
+            return
+        command = self.undo_stack.pop()
+        self.cost -= command.cost
+        command.undo(self.scene)
+        self.redo_stack.append(command)
+
+    def redo(self):
+        if not self.redo_stack:
+            return
+        command = self.redo_stack.pop()
+        command.redo(self.scene)
+        self.undo_stack.append(command)
+        self.cost += command.cost
+
+    def clear(self):
+        self.undo_stack.clear()
+        self.redo_stack.clear()
+        self.cost = 0
+
 class DiagramScene(QGraphicsScene):
     def __init__(self):
         super().__init__()
-        self.nodes = []
-        self.edges = []
+        # Dicts als geordnete Mengen: Einfügen und Entfernen in O(1)
+        self.nodes = {}
+        self.edges = {}
+        self.nodes_by_id = {}
+        self.next_node_id = 0
+        self.table_model = DiagramTableModel(self)
+        self.read_only = False
+        self.revision = 0
         self.connecting = False
         self.connect_source = None
         self.parent = None
+        self.fill_mode = FILL_GRADIENT
+        self.history = UndoHistory(self)
+        self.move_start = {}
+        # Schnappschuss-Tupel für die automatische Sicherung, laufend gepflegt:
+        # neue Elemente sofort, geänderte erst beim nächsten snapshot()
+        self.node_snapshots = {}
+        self.edge_snapshots = {}
+        self.dirty_snapshots = set()
+
+    def set_fill_mode(self, mode):
+        self.fill_mode = mode
+        self.update()
+
+    # Knoten erhalten beim Einfügen eine feste ID, über die Verbindungen beim
+    # Speichern und Laden referenziert werden
+    def add_node(self, node, node_id=None):
+        if node_id is None:
+            node_id = self.next_node_id
+        node.node_id = node_id
+        self.next_node_id = max(self.next_node_id, node_id + 1)
+        self.nodes_by_id[node_id] = node
+        self.nodes[node] = None
+        self.addItem(node)
+        self.node_snapshots[node] = node.snapshot()
+        self.table_model.node_added(node)
+        self.touch()
+        return node
+
+    def remove_node(self, node):
+        for edge in list(node.edges):
+            self.remove_edge(edge)
+        self.removeItem(node)
+        self.nodes.pop(node, None)
+        self.nodes_by_id.pop(node.node_id, None)
+        self.node_snapshots.pop(node, None)
+        self.dirty_snapshots.discard(node)
+        self.table_model.item_removed(node)
+        self.touch()
+
+    def add_edge(self, edge):
+        self.edges[edge] = None
+        self.addItem(edge)
+        self.edge_snapshots[edge] = edge.snapshot()
+        self.table_model.edge_added(edge)
+        self.touch()
+        return edge
+
+    def remove_edge(self, edge):
+        if edge not in self.edges:
+            return
+        edge.detach()
+        self.removeItem(edge)
+        del self.edges[edge]
+        del self.edge_snapshots[edge]
+        self.dirty_snapshots.discard(edge)
+        self.table_model.item_removed(edge)
+        self.touch()
+
+    # Kleine Änderungen melden der Tabelle jede Zeile einzeln, damit Scroll-
+    # position und Auswahl erhalten bleiben; erst ab TABLE_BULK_ROWS Zeilen
+    # wird das Modell einmal komplett neu aufgebaut
+    def restore_items(self, nodes, edges):
+        bulk = len(nodes) + len(edges) >= TABLE_BULK_ROWS
+        if bulk:
+            self.table_model.suspend()
+        for node in nodes:
+            self.add_node(node, node.node_id)
+        for edge in edges:
+            edge.attach()
+            self.add_edge(edge)
+        if bulk:
+            self.table_model.resume()
+
+    def remove_items(self, nodes, edges):
+        bulk = len(nodes) + len(edges) >= TABLE_BULK_ROWS
+        if bulk:
+            self.table_model.suspend()
+        for edge in edges:
+            self.remove_edge(edge)
+        for node in nodes:
+            self.remove_node(node)
+        if bulk:
+            self.table_model.resume()
+
+    # Löschen mit Undo: die an gelöschten Knoten hängenden Verbindungen
+    # werden mit aufgezeichnet
+    def delete_items(self, nodes, edges):
+        if self.read_only:
+            return
+        edges = dict.fromkeys(edges)
+        for node in nodes:
+            edges.update(dict.fromkeys(node.edges))
+        self.remove_items(nodes, edges)
+        self.history.push(RemoveItemsCommand(nodes, edges))
+
+    def item_changed(self, item):
+        self.table_model.item_changed(item)
+
+    def touch(self):
+        self.revision += 1
+
+    def snapshot_changed(self, item):
+        self.dirty_snapshots.add(item)
+        self.touch()
+
+    # Nur geänderte Elemente werden neu erfasst; die Tupel selbst entstehen
+    # aus den gepflegten Dicts in C-Geschwindigkeit
+    def snapshot(self):
+        for item in self.dirty_snapshots:
+            if item in self.nodes:
+                self.node_snapshots[item] = item.snapshot()
+            elif item in self.edges:
+                self.edge_snapshots[item] = item.snapshot()
+        self.dirty_snapshots.clear()
+        return tuple(self.node_snapshots.values()), tuple(self.edge_snapshots.values())
+
+    # Laden Datensatz für Datensatz, gemeinsam genutzt vom Laden in
+    # Zeitscheiben (ChunkedDiagramLoader) und vom direkten Laden (load_file)
+    # Verbindungen, die in der Datei vor oder zwischen den Knoten stehen,
+    # werden bis load_pending_edges() zurückgestellt
+    def begin_load(self):
+        self.clear_diagram()
+        self.table_model.suspend()
+        self.load_count = 0
+        self.nodes_complete = False
+        self.pending_edges = []
+
+    def load_record(self, key, record):
+        if key == "nodes":
+            self.add_node(NodeItem.from_dict(record), record.get("id", self.load_count))
+            self.load_count += 1
+            return
+        if self.load_count:
+            # Der Abschnitt "nodes" ist abgeschlossen, sobald danach ein
+            # anderer Abschnitt beginnt
+            self.nodes_complete = True
+        if key == "edges":
+            if self.nodes_complete:
+                self.add_edge(EdgeItem.from_dict(record, self.nodes_by_id))
+            else:
+                self.pending_edges.append(record)
+
+    def load_pending_edges(self):
+        for record in self.pending_edges:
+            self.add_edge(EdgeItem.from_dict(record, self.nodes_by_id))
+        self.pending_edges = []
+
+    def end_load(self):
+        self.pending_edges = []
+        self.table_model.resume()
+
+    def load_file(self, f):
+        self.begin_load()
+        try:
+            for key, record in diagram_reader(f).records():
+                self.load_record(key, record)
+            self.load_pending_edges()
+        finally:
+            self.end_load()
+
+    def write_json(self, f, compact=False):
+        write_json_stream(f, [
+            ("nodes", (node.to_dict() for node in self.nodes)),
+            ("edges", (edge.to_dict() for edge in self.edges))
+        ], indent=None if compact else 4)
+
+    def write_binary(self, f):
+        write_diagram_binary(f,
+                             (node.to_dict() for node in self.nodes),
+                             (edge.to_dict() for edge in self.edges))
+
+    # Gleiche Zellinhalte wie in der Tabellenansicht (DiagramTableModel.cell_text)
+    def table_rows(self):
+        cell_text = self.table_model.cell_text
+        columns = range(len(DiagramTableModel.HEADERS))
+        for items in (self.nodes, self.edges):
+            for item in items:
+                yield tuple(cell_text(item, column) for column in columns)
+
+    def export_table(self, path):
+        ext = os.path.splitext(path)[1].lower()
+        write, binary = TABLE_FORMATS.get(ext, TABLE_FORMATS[".csv"])
+        if binary:
+            with open(path, "wb") as f:
+                write(f, DiagramTableModel.HEADERS, self.table_rows())
+        else:
+            with open(path, "w", encoding="utf-8", newline="") as f:
+                write(f, DiagramTableModel.HEADERS, self.table_rows())
+
+    # Unveränderliche Zeichenliste für den Export in Hintergrund-Threads:
+    # Pfade, Pinsel und Schriften werden hier im GUI-Thread eingesammelt,
+    # die Worker greifen nicht mehr auf die Szene zu
+    def display_list(self):
+        entries = []
+        paths = set()
+        # Aufsteigende Z-Reihenfolge, damit obere Knoten zuletzt gemalt werden
+        for item in self.items(Qt.AscendingOrder):
+            if isinstance(item, EdgeItem):
+                labels = [text_label(item.text_item)] if item.label_text else []
+                entries.append((item.sceneBoundingRect().united(item.text_item.sceneBoundingRect()),
+                                "edge", QLineF(item.line()), QPen(item.pen), labels))
+            elif isinstance(item, NodeItem):
+                path = item.shape_path()
+                if id(path) not in paths:
+                    paths.add(id(path))
+                    # Die Grenzen eines QPainterPath werden beim ersten Zugriff
+                    # berechnet und im Pfad gespeichert; das hier im GUI-Thread
+                    # erledigen, bevor die Kachel-Threads den Pfad gemeinsam nutzen
+                    path.boundingRect()
+                    path.controlPointRect()
+                labels = [text_label(text_item) for text_item in (item.text_item1, item.text_item2)
+                          if text_item.toPlainText()]
+                # Beschriftungen können über den Knoten hinausragen
+                bounds = item.sceneBoundingRect().united(item.mapRectToScene(item.childrenBoundingRect()))
+                entries.append((bounds, "node", item.scenePos(), path,
+                                cached_split_brush(item.color1, item.color2), QPen(item.pen), labels))
+        entries.sort(key=lambda entry: entry[1] == "node")
+        return entries
+
+    def delete_selection(self):
+        selected = self.selectedItems()
+        self.delete_items([item for item in selected if isinstance(item, NodeItem)],
+                          [item for item in selected if isinstance(item, EdgeItem)])
+
+    def keyPressEvent(self, event):
+        if event.key() == Qt.Key_Delete and self.focusItem() is None:
+            self.delete_selection()
+        else:
+            super().keyPressEvent(event)
+
+    def clear_diagram(self):
+        for itm in list(self.items()):
+            self.removeItem(itm)
+        self.nodes.clear()
+        self.edges.clear()
+        self.nodes_by_id.clear()
+        self.node_snapshots.clear()
+        self.edge_snapshots.clear()
+        self.dirty_snapshots.clear()
+        self.next_node_id = 0
+        self.table_model.reset()
+        self.history.clear()
+        self.touch()
 
     def mousePressEvent(self, event):
         item = self.itemAt(event.scenePos(), QTransform())
@@ -253,14 +1510,506 @@ class DiagramScene(QGraphicsScene):
             else:
                 line_style = Qt.SolidLine
             edge = EdgeItem(self.connect_source, dest, line_style)
-            self.addItem(edge)
-            self.edges.append(edge)
+            self.add_edge(edge)
+            self.history.push(AddItemsCommand(edges=[edge]))
             self.connecting = False
             self.connect_source = None
-            if self.parent:
-                self.parent.update_table()
         else:
             super().mousePressEvent(event)
+            self.move_start = {node: node.pos() for node in self.selectedItems()
+                               if isinstance(node, NodeItem)}
+
+    def mouseReleaseEvent(self, event):
+        super().mouseReleaseEvent(event)
+        moves = {node: (old, node.pos()) for node, old in self.move_start.items()
+                 if node.pos() != old and node in self.nodes}
+        self.move_start = {}
+        if moves:
+            self.history.push(MoveNodesCommand(moves))
+
+# Lädt ein Diagramm in Zeitscheiben aus der Event-Loop heraus, damit die
+# Oberfläche bedienbar bleibt und die ersten Knoten sofort sichtbar sind
+class ChunkedDiagramLoader:
+    def __init__(self, parent, scene, path, on_finished=None):
+        self.scene = scene
+        self.on_finished = on_finished
+        self.path = path
+        # Datei und Leser werden erst im ersten Schritt geöffnet, damit auch
+        # Fehler beim Öffnen (z. B. abgeschnittenes .gz) im Dialog landen
+        self.file = None
+        self.reader = None
+        self.records = None
+        self.progress = QProgressDialog("Diagramm wird geladen …", "Abbrechen", 0, 0, parent)
+        self.progress.setWindowModality(Qt.WindowModal)
+        self.progress.setMinimumDuration(500)
+        self.progress.canceled.connect(self.cancel)
+        self.timer = QTimer()
+        self.timer.timeout.connect(self.step)
+        self.scene.begin_load()
+        self.timer.start(0)
+
+    def step(self):
+        deadline = time.perf_counter() + LOAD_TIME_SLICE
+        done = False
+        try:
+            if self.records is None:
+                self.file = open(self.path, "rb")
+                # Fortschritt in KiB, damit auch sehr große Dateien in den int-Bereich passen
+                self.progress.setMaximum(os.fstat(self.file.fileno()).st_size // 1024 + 1)
+                self.reader = diagram_reader(self.file)
+                self.records = self.reader.records()
+            while time.perf_counter() < deadline:
+                record = next(self.records, None)
+                if record is None:
+                    self.scene.load_pending_edges()
+                    done = True
+                    break
+                self.scene.load_record(*record)
+        except LOAD_ERRORS as e:
+            self.finish(False)
+            QMessageBox.warning(self.progress.parent(), "Fehler", f"Diagramm konnte nicht geladen werden: {e}")
+            return
+        if done:
+            self.finish(True)
+            return
+        self.progress.setValue(self.reader.bytes_read // 1024)
+
+    def cancel(self):
+        if self.timer.isActive():
+            self.finish(False)
+
+    def finish(self, ok):
+        self.timer.stop()
+        if self.file is not None:
+            self.file.close()
+        self.progress.canceled.disconnect(self.cancel)
+        self.progress.reset()
+        if not ok:
+            self.scene.clear_diagram()
+        self.scene.end_load()
+        if self.on_finished:
+            self.on_finished(ok)
+
+# Materialisiert für ein MappedDiagram nur die Knoten im sichtbaren Bereich
+# (plus Rand) und deren Verbindungen als QGraphicsItems. Knoten, die den
+# Bereich verlassen, kommen in einen Pool und werden wiederverwendet.
+class LazyDiagramController:
+    def __init__(self, scene, view, document):
+        self.scene = scene
+        self.view = view
+        self.document = document
+        self.node_items = {}
+        self.edge_items = {}
+        self.pool = []
+        self.refresh_pending = False
+        x1, y1, x2, y2 = document.bounds()
+        scene.read_only = True
+        scene.setSceneRect(QRectF(x1, y1, x2 - x1, y2 - y1))
+        view.horizontalScrollBar().valueChanged.connect(self.schedule_refresh)
+        view.verticalScrollBar().valueChanged.connect(self.schedule_refresh)
+        self.schedule_refresh()
+
+    def schedule_refresh(self, *args):
+        if not self.refresh_pending:
+            self.refresh_pending = True
+            QTimer.singleShot(0, self.refresh)
+
+    def refresh(self):
+        self.refresh_pending = False
+        visible = self.view.mapToScene(self.view.viewport().rect()).boundingRect()
+        margin = max(visible.width(), visible.height()) * LAZY_MARGIN
+        area = visible.adjusted(-margin, -margin, margin, margin)
+        wanted = self.document.query(area.left(), area.top(), area.right(), area.bottom(),
+                                     limit=LAZY_MAX_NODES)
+        wanted_edges = set()
+        for i in wanted:
+            wanted_edges.update(self.document.incident_edges(i))
+        # Endknoten von Verbindungen, die aus dem Bereich herausführen
+        needed = set(wanted)
+        for e in wanted_edges:
+            needed.add(self.document.edge_source[e])
+            needed.add(self.document.edge_dest[e])
+        needed.discard(-1)
+
+        for e in [e for e in self.edge_items if e not in wanted_edges]:
+            edge = self.edge_items.pop(e)
+            edge.detach()
+            self.scene.removeItem(edge)
+        for i in [i for i in self.node_items if i not in needed]:
+            node = self.node_items.pop(i)
+            self.scene.removeItem(node)
+            self.pool.append(node)
+        for i in needed:
+            if i not in self.node_items:
+                self.node_items[i] = self.materialise_node(i)
+        for e in wanted_edges:
+            if e not in self.edge_items:
+                source = self.node_items.get(self.document.edge_source[e])
+                dest = self.node_items.get(self.document.edge_dest[e])
+                if source is not None and dest is not None:
+                    edge = EdgeItem.from_dict(self.document.edge_record(e),
+                                              {source.node_id: source, dest.node_id: dest})
+                    self.scene.addItem(edge)
+                    self.edge_items[e] = edge
+        del self.pool[LAZY_POOL_SIZE:]
+
+    def materialise_node(self, i):
+        record = self.document.node_record(i)
+        if self.pool:
+            node = self.pool.pop()
+            node.apply_dict(record)
+        else:
+            node = NodeItem.from_dict(record)
+            node.setFlag(QGraphicsRectItem.ItemIsMovable, False)
+        node.node_id = record["id"]
+        self.scene.addItem(node)
+        return node
+
+    def close(self):
+        self.view.horizontalScrollBar().valueChanged.disconnect(self.schedule_refresh)
+        self.view.verticalScrollBar().valueChanged.disconnect(self.schedule_refresh)
+        for edge in self.edge_items.values():
+            edge.detach()
+            self.scene.removeItem(edge)
+        for node in self.node_items.values():
+            self.scene.removeItem(node)
+        self.edge_items.clear()
+        self.node_items.clear()
+        self.pool.clear()
+        self.scene.read_only = False
+        self.scene.setSceneRect(QRectF())
+        self.document.close()
+
+# Automatische Sicherung: Im GUI-Thread wird nur ein Schnappschuss aus
+# einfachen Tupeln genommen (und nur, wenn sich die Szene geändert hat).
+# Kodieren, Komprimieren und das atomare Schreiben per Umbenennen laufen in
+# einem Hintergrund-Thread, unveränderte Inhalte werden nicht neu geschrieben.
+class AutosaveService:
+    NODE_KEYS = [key for key, _, _ in BINARY_NODE_COLUMNS]
+    EDGE_KEYS = [key for key, _, _ in BINARY_EDGE_COLUMNS]
+
+    def __init__(self, scene, path, interval_ms=AUTOSAVE_INTERVAL_MS):
+        self.scene = scene
+        self.path = path
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.pending = None
+        self.saved_revision = None
+        self.last_hash = None
+        self.timer = QTimer()
+        self.timer.timeout.connect(self.autosave)
+        self.timer.start(interval_ms)
+
+    def autosave(self):
+        if self.pending is not None:
+            if not self.pending.done():
+                return
+            if self.pending.exception() is not None:
+                self.saved_revision = None
+            self.pending = None
+        if self.scene.revision == self.saved_revision:
+            return
+        self.saved_revision = self.scene.revision
+        self.pending = self.executor.submit(self.write, self.scene.snapshot())
+
+    def write(self, snapshot):
+        digest = hash(snapshot)
+        if digest == self.last_hash:
+            return False
+        nodes, edges = snapshot
+        buf = io.BytesIO()
+        write_diagram_binary(buf,
+                             (dict(zip(self.NODE_KEYS, node)) for node in nodes),
+                             (dict(zip(self.EDGE_KEYS, edge)) for edge in edges))
+        data = gzip.compress(buf.getvalue())
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        self.last_hash = digest
+        return True
+
+    def pause(self):
+        self.timer.stop()
+
+    # Änderungen aus der Pause (z. B. Leeren der Szene) nicht nachträglich sichern
+    def resume(self):
+        self.saved_revision = self.scene.revision
+        self.timer.start()
+
+    def stop(self, remove=True):
+        self.timer.stop()
+        self.executor.shutdown(wait=True)
+        if remove and os.path.exists(self.path):
+            os.remove(self.path)
+
+def text_label(text_item):
+    font = QFont(text_item.font())
+    margin = text_item.document().documentMargin()
+    origin = text_item.scenePos() + QPointF(margin, margin + QFontMetricsF(font).ascent())
+    return (origin, font, text_item.defaultTextColor(), text_item.toPlainText())
+
+def paint_display_entry(painter, entry):
+    if entry[1] == "edge":
+        _, _, line, pen, labels = entry
+        painter.setPen(pen)
+        painter.drawLine(line)
+    else:
+        _, _, pos, path, brush, pen, labels = entry
+        painter.setPen(pen)
+        painter.setBrush(brush)
+        painter.translate(pos)
+        painter.drawPath(path)
+        painter.translate(-pos)
+    for origin, font, color, text in labels:
+        painter.setFont(font)
+        painter.setPen(color)
+        painter.drawText(origin, text)
+
+# PNG zeilenweise schreiben: IDAT-Daten entstehen streifenweise, das
+# Gesamtbild liegt nie vollständig im Speicher
+class PngStreamWriter:
+    CHUNK_SIZE = 1 << 16
+
+    def __init__(self, f, width, height, dpi=None):
+        self.f = f
+        self.width = width
+        f.write(b"\x89PNG\r\n\x1a\n")
+        self.write_chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+        if dpi:
+            ppm = int(round(dpi / 0.0254))
+            self.write_chunk(b"pHYs", struct.pack(">IIB", ppm, ppm, 1))
+        self.compressor = zlib.compressobj(6)
+        self.buffer = []
+        self.buffered = 0
+
+    def write_chunk(self, tag, data):
+        self.f.write(struct.pack(">I", len(data)))
+        self.f.write(tag)
+        self.f.write(data)
+        self.f.write(struct.pack(">I", zlib.crc32(tag + data) & 0xffffffff))
+
+    def write_row(self, rgb):
+        data = self.compressor.compress(b"\x00" + rgb)
+        if data:
+            self.buffer.append(data)
+            self.buffered += len(data)
+            if self.buffered >= self.CHUNK_SIZE:
+                self.flush_idat()
+
+    def flush_idat(self):
+        if self.buffer:
+            self.write_chunk(b"IDAT", b"".join(self.buffer))
+            self.buffer = []
+            self.buffered = 0
+
+    def close(self):
+        self.buffer.append(self.compressor.flush())
+        self.flush_idat()
+        self.write_chunk(b"IEND", b"")
+
+# Eine Kachel mit eigenem QImage und QPainter; PyQt gibt den GIL während
+# der Qt-Zeichenaufrufe frei, so dass die Kacheln parallel entstehen
+class TileRenderJob(QRunnable):
+    def __init__(self, entries, source, width, height, scale, results, key):
+        super().__init__()
+        self.setAutoDelete(False)
+        self.entries = entries
+        self.source = source
+        self.width = width
+        self.height = height
+        self.scale = scale
+        self.results = results
+        self.key = key
+
+    def run(self):
+        image = QImage(self.width, self.height, QImage.Format_RGB888)
+        image.fill(Qt.white)
+        painter = QPainter(image)
+        painter.setRenderHints(QPainter.Antialiasing | QPainter.TextAntialiasing)
+        painter.scale(self.scale, self.scale)
+        painter.translate(-self.source.x(), -self.source.y())
+        for entry in self.entries:
+            paint_display_entry(painter, entry)
+        painter.end()
+        stride = image.bytesPerLine()
+        self.results[self.key] = (image.constBits().asstring(stride * self.height), stride)
+
+def export_png_tiled(scene, f, scale=1.0, dpi=None, progress=None, tile_size=EXPORT_TILE_SIZE):
+    rect = scene.itemsBoundingRect()
+    width = max(1, int(rect.width() * scale))
+    height = max(1, int(rect.height() * scale))
+    columns = (width + tile_size - 1) // tile_size
+    rows = (height + tile_size - 1) // tile_size
+    step = tile_size / scale
+
+    buckets = {}
+    for entry in scene.display_list():
+        bounds = entry[0]
+        c1 = max(0, int((bounds.left() - rect.left()) / step))
+        c2 = min(columns - 1, int((bounds.right() - rect.left()) / step))
+        r1 = max(0, int((bounds.top() - rect.top()) / step))
+        r2 = min(rows - 1, int((bounds.bottom() - rect.top()) / step))
+        for r in range(r1, r2 + 1):
+            for c in range(c1, c2 + 1):
+                buckets.setdefault((r, c), []).append(entry)
+
+    pool = QThreadPool.globalInstance()
+    writer = PngStreamWriter(f, width, height, dpi)
+    if progress is not None:
+        progress.setRange(0, rows)
+    for r in range(rows):
+        tile_h = min(tile_size, height - r * tile_size)
+        results = {}
+        jobs = []
+        for c in range(columns):
+            tile_w = min(tile_size, width - c * tile_size)
+            source = QPointF(rect.left() + c * step, rect.top() + r * step)
+            job = TileRenderJob(buckets.pop((r, c), ()), source, tile_w, tile_h, scale, results, c)
+            jobs.append(job)
+            pool.start(job)
+        pool.waitForDone()
+        tiles = [results[c] for c in range(columns)]
+        widths = [min(tile_size, width - c * tile_size) * 3 for c in range(columns)]
+        for y in range(tile_h):
+            writer.write_row(b"".join(data[y * stride:y * stride + w]
+                                      for (data, stride), w in zip(tiles, widths)))
+        if progress is not None:
+            progress.setValue(r + 1)
+            QApplication.processEvents()
+            if progress.wasCanceled():
+                return False
+    writer.close()
+    return True
+
+def export_pdf_pages(scene, path, page_size=QPageSize.A4, orientation=QPageLayout.Portrait,
+                     overlap=PDF_PAGE_OVERLAP):
+    writer = QPdfWriter(path)
+    writer.setResolution(EXPORT_BASE_DPI)
+    writer.setPageLayout(QPageLayout(QPageSize(page_size), orientation,
+                                     QMarginsF(*[PDF_PAGE_MARGIN_MM] * 4), QPageLayout.Millimeter))
+    page_w = writer.width()
+    page_h = writer.height()
+    step_x = max(1, page_w - overlap)
+    step_y = max(1, page_h - overlap)
+    rect = scene.itemsBoundingRect()
+    columns = max(1, math.ceil((rect.width() - overlap) / step_x))
+    rows = max(1, math.ceil((rect.height() - overlap) / step_y))
+    painter = QPainter(writer)
+    pages = 0
+    for r in range(rows):
+        for c in range(columns):
+            source = QRectF(rect.left() + c * step_x, rect.top() + r * step_y, page_w, page_h)
+            # Leere Seiten über den Szenenindex erkennen und auslassen
+            if not scene.items(source):
+                continue
+            if pages:
+                writer.newPage()
+            scene.render(painter, QRectF(0, 0, page_w, page_h), source)
+            pages += 1
+    painter.end()
+    return pages
+
+# SVG-Export: jede Kombination aus Form, Größe und Farben wird einmal als
+# <symbol> definiert und per <use> platziert, Verbindungen gleichen Stils
+# bilden einen gemeinsamen Pfad
+SVG_DASH_PATTERNS = {
+    Qt.DashLine: [4, 2],
+    Qt.DotLine: [1, 2],
+    Qt.DashDotLine: [4, 2, 1, 2],
+    Qt.DashDotDotLine: [4, 2, 1, 2, 1, 2],
+}
+
+def svg_number(value):
+    return f"{value:.2f}".rstrip("0").rstrip(".")
+
+def svg_path_data(path):
+    parts = []
+    i = 0
+    count = path.elementCount()
+    while i < count:
+        e = path.elementAt(i)
+        if e.type == QPainterPath.MoveToElement:
+            parts.append(f"M{svg_number(e.x)} {svg_number(e.y)}")
+        elif e.type == QPainterPath.LineToElement:
+            parts.append(f"L{svg_number(e.x)} {svg_number(e.y)}")
+        else:
+            c2 = path.elementAt(i + 1)
+            end = path.elementAt(i + 2)
+            parts.append("C" + " ".join(svg_number(v) for v in (e.x, e.y, c2.x, c2.y, end.x, end.y)))
+            i += 2
+        i += 1
+    return "".join(parts) + "Z"
+
+def svg_text(label):
+    origin, font, color, text = label
+    size = font.pixelSize() if font.pixelSize() > 0 else font.pointSizeF() * EXPORT_BASE_DPI / 72
+    return (f'<text x="{svg_number(origin.x())}" y="{svg_number(origin.y())}" '
+            f'font-family={quoteattr(font.family())} font-size="{svg_number(size)}" '
+            f'fill="{color.name()}">{escape(text)}</text>\n')
+
+def write_svg(scene, f):
+    rect = scene.itemsBoundingRect()
+    f.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+    f.write(f'<svg xmlns="http://www.w3.org/2000/svg" xmlns:xlink="http://www.w3.org/1999/xlink" '
+            f'width="{svg_number(rect.width())}" height="{svg_number(rect.height())}" '
+            f'viewBox="{svg_number(rect.x())} {svg_number(rect.y())} '
+            f'{svg_number(rect.width())} {svg_number(rect.height())}">\n')
+    f.write(f'<rect x="{svg_number(rect.x())}" y="{svg_number(rect.y())}" width="100%" height="100%" fill="white"/>\n')
+
+    nodes = []
+    edge_paths = {}
+    labels = []
+    for item in scene.items():
+        if isinstance(item, EdgeItem):
+            line = item.line()
+            key = (item.pen.style(), item.pen.color().name(), item.pen.widthF())
+            edge_paths.setdefault(key, []).append(
+                f"M{svg_number(line.x1())} {svg_number(line.y1())}L{svg_number(line.x2())} {svg_number(line.y2())}")
+            if item.label_text:
+                labels.append(text_label(item.text_item))
+        elif isinstance(item, NodeItem):
+            nodes.append(item)
+
+    # Symbole vorab sammeln, damit <defs> vor den Verweisen steht
+    symbols = {}
+    placed = []
+    for node in reversed(nodes):
+        r = node.rect()
+        key = (node.shape, r.width(), r.height(), node.color1.name(), node.color2.name())
+        symbol = symbols.get(key)
+        if symbol is None:
+            symbol = symbols[key] = f"s{len(symbols)}"
+        placed.append((node, symbol))
+
+    f.write("<defs>\n")
+    for (shape, w, h, color1, color2), symbol in symbols.items():
+        path = cached_shape_path(shape, w, h)
+        f.write(f'<linearGradient id="{symbol}g" x1="0" y1="0" x2="0" y2="1">'
+                f'<stop offset="0.5" stop-color="{color1}"/><stop offset="0.5" stop-color="{color2}"/>'
+                f'</linearGradient>\n')
+        f.write(f'<symbol id="{symbol}" viewBox="0 0 {svg_number(w)} {svg_number(h)}" overflow="visible">'
+                f'<path d="{svg_path_data(path)}" fill="url(#{symbol}g)" stroke="black"/></symbol>\n')
+    f.write("</defs>\n")
+
+    for (style, color, width), segments in edge_paths.items():
+        dash = ""
+        if style in SVG_DASH_PATTERNS:
+            dash = ' stroke-dasharray="' + ",".join(svg_number(v * width) for v in SVG_DASH_PATTERNS[style]) + '"'
+        f.write(f'<path fill="none" stroke="{color}" stroke-width="{svg_number(width)}"{dash} d="{"".join(segments)}"/>\n')
+    for label in labels:
+        f.write(svg_text(label))
+
+    for node, symbol in placed:
+        r = node.rect()
+        pos = node.scenePos()
+        f.write(f'<use xlink:href="#{symbol}" x="{svg_number(pos.x() + r.x())}" y="{svg_number(pos.y() + r.y())}" '
+                f'width="{svg_number(r.width())}" height="{svg_number(r.height())}"/>\n')
+        for text_item in (node.text_item1, node.text_item2):
+            if text_item.toPlainText():
+                f.write(svg_text(text_label(text_item)))
+    f.write("</svg>\n")
 
 class Template:
     def __init__(self, name, shape, color1, color2, width, height, text1, text2):
@@ -285,9 +2034,30 @@ class MainWindow(QMainWindow):
         self.setCentralWidget(self.view)
 
         self.templates = []
+        self.lazy_document = None
         self.load_templates()
         self.init_ui()
-        self.update_table()
+        # Stand der Szene beim letzten Speichern/Laden, für die Nachfrage vor
+        # dem Verwerfen ungespeicherter Änderungen
+        self.saved_revision = self.scene.revision
+        self.restore_autosave()
+        self.autosave = AutosaveService(self.scene, AUTOSAVE_FILE)
+
+    def restore_autosave(self):
+        if not os.path.exists(AUTOSAVE_FILE):
+            return
+        answer = QMessageBox.question(
+            self, "Wiederherstellen",
+            "Es gibt eine automatische Sicherung der letzten Sitzung. Wiederherstellen?",
+            QMessageBox.Yes | QMessageBox.No)
+        if answer == QMessageBox.Yes:
+            self.loader = ChunkedDiagramLoader(self, self.scene, AUTOSAVE_FILE)
+        else:
+            os.remove(AUTOSAVE_FILE)
+
+    def closeEvent(self, event):
+        self.autosave.stop()
+        super().closeEvent(event)
 
     def init_ui(self):
         toolbar = QToolBar()
@@ -297,6 +2067,16 @@ class MainWindow(QMainWindow):
         add_node_action.triggered.connect(self.add_node)
         toolbar.addAction(add_node_action)
 
+        undo_action = QAction("Rückgängig", self)
+        undo_action.setShortcut(QKeySequence.Undo)
+        undo_action.triggered.connect(self.undo)
+        toolbar.addAction(undo_action)
+
+        redo_action = QAction("Wiederholen", self)
+        redo_action.setShortcut(QKeySequence.Redo)
+        redo_action.triggered.connect(self.redo)
+        toolbar.addAction(redo_action)
+
         new_page_action = QAction("Neue Seite", self)
         new_page_action.triggered.connect(self.new_page)
         toolbar.addAction(new_page_action)
@@ -304,11 +2084,17 @@ class MainWindow(QMainWindow):
         save_action = QAction("Speichern", self)
         save_action.triggered.connect(self.save_diagram)
         toolbar.addAction(save_action)
+        # In der schreibgeschützten Ansicht großer Dateien abgeschaltet
+        self.edit_actions = [add_node_action, save_action]
 
         load_action = QAction("Laden", self)
         load_action.triggered.connect(self.load_diagram)
         toolbar.addAction(load_action)
 
+        view_large_action = QAction("Große Datei ansehen", self)
+        view_large_action.triggered.connect(self.view_large_diagram)
+        toolbar.addAction(view_large_action)
+
         export_img_action = QAction("Als Bild exportieren", self)
         export_img_action.triggered.connect(self.export_image)
         toolbar.addAction(export_img_action)
@@ -317,6 +2103,10 @@ class MainWindow(QMainWindow):
         export_pdf_action.triggered.connect(self.export_pdf)
         toolbar.addAction(export_pdf_action)
 
+        export_svg_action = QAction("Als SVG exportieren", self)
+        export_svg_action.triggered.connect(self.export_svg)
+        toolbar.addAction(export_svg_action)
+
         export_table_action = QAction("Tabelle exportieren", self)
         export_table_action.triggered.connect(self.export_table)
         toolbar.addAction(export_table_action)
@@ -342,8 +2132,11 @@ class MainWindow(QMainWindow):
         self.addDockWidget(Qt.RightDockWidgetArea, template_dock)
 
         # Tabelle rechts unten
-        self.table = QTableWidget(0, 4)
-        self.table.setHorizontalHeaderLabels(["Text1", "Text2", "Form/Verbindung", "Farbe1/Farbe2"])
+        self.table = QTableView()
+        self.table.setModel(self.scene.table_model)
+        # Feste Zeilenhöhe, damit die Ansicht nicht jede Zeile vermessen muss
+        self.table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.table.verticalHeader().setDefaultSectionSize(22)
         table_dock = QDockWidget("Tabelle", self)
         table_dock.setWidget(self.table)
         self.addDockWidget(Qt.RightDockWidgetArea, table_dock)
@@ -354,36 +2147,8 @@ class MainWindow(QMainWindow):
         pixmap.fill(Qt.transparent)
         painter = QPainter(pixmap)
         # Zweifarbiges Icon
-        r = QRectF(0, 0, 32, 32)
-        path = QPainterPath()
-        if tpl.shape == "rect":
-            path.addRect(r)
-        elif tpl.shape == "ellipse":
-            path.addEllipse(r)
-        elif tpl.shape == "diamond":
-            points = [QPointF(16, 0), QPointF(32, 16), QPointF(16, 32), QPointF(0, 16)]
-            path.addPolygon(QPolygonF(points))
-        elif tpl.shape == "triangle":
-            points = [QPointF(16, 0), QPointF(32, 32), QPointF(0, 32)]
-            path.addPolygon(QPolygonF(points))
-        elif tpl.shape == "hexagon":
-            pts = [
-                QPointF(8, 0), QPointF(24, 0), QPointF(32, 16),
-                QPointF(24, 32), QPointF(8, 32), QPointF(0, 16)
-            ]
-            path.addPolygon(QPolygonF(pts))
-        painter.save()
-        painter.setBrush(QBrush(QColor(tpl.color1)))
-        painter.setPen(QPen(Qt.black))
-        painter.setClipRect(QRectF(0, 0, 32, 16))
-        painter.drawPath(path)
-        painter.restore()
-        painter.save()
-        painter.setBrush(QBrush(QColor(tpl.color2)))
-        painter.setPen(QPen(Qt.black))
-        painter.setClipRect(QRectF(0, 16, 32, 16))
-        painter.drawPath(path)
-        painter.restore()
+        path = cached_shape_path(tpl.shape, 32, 32)
+        painter.setBrush(cached_split_brush(QColor(tpl.color1), QColor(tpl.color2)))
         painter.setPen(QPen(Qt.black))
         painter.drawPath(path)
         painter.end()
@@ -404,13 +2169,16 @@ class MainWindow(QMainWindow):
             self.save_templates()
 
     def add_node(self):
+        if self.lazy_document:
+            return
         node = NodeItem()
         node.setPos(self.view.mapToScene(self.view.viewport().rect().center()))
-        self.scene.addItem(node)
-        self.scene.nodes.append(node)
-        self.update_table()
+        self.scene.add_node(node)
+        self.scene.history.push(AddItemsCommand([node]))
 
     def add_node_from_template(self, item: QListWidgetItem):
+        if self.lazy_document:
+            return
         name = item.text()
         tpl = next((t for t in self.templates if t.name == name), None)
         if tpl:
@@ -423,119 +2191,149 @@ class MainWindow(QMainWindow):
                 color2=QColor(tpl.color2)
             )
             node.setPos(self.view.mapToScene(self.view.viewport().rect().center()))
-            self.scene.addItem(node)
-            self.scene.nodes.append(node)
-            self.update_table()
+            self.scene.add_node(node)
+            self.scene.history.push(AddItemsCommand([node]))
+
+    def undo(self):
+        if not self.scene.read_only:
+            self.scene.history.undo()
+
+    def redo(self):
+        if not self.scene.read_only:
+            self.scene.history.redo()
+
+    def confirm_discard(self):
+        if self.lazy_document or not self.scene.nodes or self.scene.revision == self.saved_revision:
+            return True
+        answer = QMessageBox.question(
+            self, "Ungespeicherte Änderungen",
+            "Das aktuelle Diagramm enthält ungespeicherte Änderungen. Verwerfen?",
+            QMessageBox.Yes | QMessageBox.No)
+        return answer == QMessageBox.Yes
 
     def new_page(self):
-        for itm in list(self.scene.items()):
-            self.scene.removeItem(itm)
-        self.scene.nodes.clear()
-        self.scene.edges.clear()
-        self.table.setRowCount(0)
+        if self.confirm_discard():
+            self.reset_page()
+
+    def reset_page(self):
+        self.close_large_diagram()
+        self.scene.clear_diagram()
+        self.saved_revision = self.scene.revision
+
+    # Die schreibgeschützte Ansicht ist kein bearbeitbarer Zustand; die
+    # automatische Sicherung ruht so lange, damit sie die Sicherung des
+    # vorherigen Diagramms nicht mit einer leeren Szene überschreibt
+    def view_large_diagram(self):
+        path, _ = QFileDialog.getOpenFileName(self, "Große Datei ansehen", "", "Diagramm-Binärdatei (*.dgrm)")
+        if not path or not self.confirm_discard():
+            return
+        try:
+            document = MappedDiagram(path)
+        except (OSError, ValueError) as e:
+            QMessageBox.warning(self, "Fehler", f"Datei konnte nicht geöffnet werden: {e}")
+            return
+        self.reset_page()
+        self.autosave.pause()
+        self.lazy_document = LazyDiagramController(self.scene, self.view, document)
+        for action in self.edit_actions:
+            action.setEnabled(False)
+
+    def close_large_diagram(self):
+        if self.lazy_document:
+            self.lazy_document.close()
+            self.lazy_document = None
+            self.autosave.resume()
+            for action in self.edit_actions:
+                action.setEnabled(True)
 
+    # Während der schreibgeschützten Ansicht enthalten die Register der Szene
+    # nur die gerade sichtbaren Knoten; Speichern würde die Datei verstümmeln
     def save_diagram(self):
-        path, _ = QFileDialog.getSaveFileName(self, "Diagramm speichern", "", "JSON-Datei (*.json)")
+        if self.lazy_document:
+            return
+        path, selected_filter = QFileDialog.getSaveFileName(
+            self, "Diagramm speichern", "",
+            "JSON-Datei (*.json);;JSON-Datei kompakt (*.json);;Diagramm-Binärdatei (*.dgrm)")
         if not path:
             return
-        data = {"nodes": [], "edges": []}
-        for idx, node in enumerate(self.scene.nodes):
-            data["nodes"].append({
-                "id": idx,
-                "shape": node.shape,
-                "color1": node.color1.name(),
-                "color2": node.color2.name(),
-                "x": node.pos().x(),
-                "y": node.pos().y(),
-                "width": node.rect().width(),
-                "height": node.rect().height(),
-                "text1": node.text1,
-                "text2": node.text2
-            })
-        for edge in self.scene.edges:
-            src_id = self.scene.nodes.index(edge.source)
-            dest_id = self.scene.nodes.index(edge.dest)
-            style = edge.pen.style()
-            label = edge.label_text
-            data["edges"].append({"source": src_id, "dest": dest_id, "style": style, "label": label})
-        with open(path, "w") as f:
-            json.dump(data, f, indent=4)
+        if path.endswith(".dgrm") or "dgrm" in selected_filter:
+            with open(path, "wb") as f:
+                self.scene.write_binary(f)
+        else:
+            with open(path, "w") as f:
+                self.scene.write_json(f, compact="kompakt" in selected_filter)
+        self.saved_revision = self.scene.revision
         QMessageBox.information(self, "Gespeichert", "Diagramm wurde gespeichert.")
 
     def load_diagram(self):
-        path, _ = QFileDialog.getOpenFileName(self, "Diagramm laden", "", "JSON-Datei (*.json)")
-        if not path:
+        path, _ = QFileDialog.getOpenFileName(
+            self, "Diagramm laden", "", "Diagramme (*.json *.dgrm);;JSON-Datei (*.json);;Diagramm-Binärdatei (*.dgrm)")
+        if not path or not self.confirm_discard():
             return
-        with open(path, "r") as f:
-            data = json.load(f)
-        for itm in list(self.scene.items()):
-            self.scene.removeItem(itm)
-        self.scene.nodes.clear()
-        self.scene.edges.clear()
-        for node_data in data.get("nodes", []):
-            node = NodeItem(
-                shape=node_data.get("shape", "rect"),
-                rect=QRectF(0, 0, node_data.get("width", 100), node_data.get("height", 60)),
-                text1=node_data.get("text1", ""),
-                text2=node_data.get("text2", ""),
-                color1=QColor(node_data.get("color1", "lightgray")),
-                color2=QColor(node_data.get("color2", "white"))
-            )
-            node.setPos(node_data.get("x", 0), node_data.get("y", 0))
-            self.scene.addItem(node)
-            self.scene.nodes.append(node)
-        for edge_data in data.get("edges", []):
-            src = self.scene.nodes[edge_data.get("source")]
-            dest = self.scene.nodes[edge_data.get("dest")]
-            style = edge_data.get("style", Qt.SolidLine)
-            label = edge_data.get("label", "")
-            edge = EdgeItem(src, dest, style, label)
-            self.scene.addItem(edge)
-            self.scene.edges.append(edge)
-        self.update_table()
-        QMessageBox.information(self, "Geladen", "Diagramm wurde geladen.")
+        self.close_large_diagram()
+        self.loader = ChunkedDiagramLoader(self, self.scene, path, self.load_finished)
+
+    def load_finished(self, ok):
+        self.loader = None
+        if ok:
+            self.saved_revision = self.scene.revision
+            QMessageBox.information(self, "Geladen", "Diagramm wurde geladen.")
 
     def export_image(self):
         path, _ = QFileDialog.getSaveFileName(self, "Als Bild exportieren", "", "PNG-Bild (*.png);;JPEG-Bild (*.jpg)")
         if not path:
             return
+        dpi, ok = QInputDialog.getInt(self, "Auflösung", "DPI:", EXPORT_BASE_DPI, 24, 2400, 1)
+        if not ok:
+            return
+        scale = dpi / EXPORT_BASE_DPI
         rect = self.scene.itemsBoundingRect()
-        image = QImage(int(rect.width()), int(rect.height()), QImage.Format_ARGB32)
-        image.fill(Qt.white)
-        painter = QPainter(image)
-        self.scene.render(painter, QRectF(image.rect()), rect)
-        painter.end()
-        image.save(path)
+        if path.lower().endswith(".png"):
+            progress = QProgressDialog("Bild wird exportiert...", "Abbrechen", 0, 0, self)
+            progress.setWindowModality(Qt.WindowModal)
+            progress.setMinimumDuration(500)
+            with open(path, "wb") as f:
+                ok = export_png_tiled(self.scene, f, scale, dpi, progress)
+            progress.close()
+            if not ok:
+                os.remove(path)
+                return
+        else:
+            image = QImage(int(rect.width() * scale), int(rect.height() * scale), QImage.Format_ARGB32)
+            image.fill(Qt.white)
+            painter = QPainter(image)
+            self.scene.render(painter, QRectF(image.rect()), rect)
+            painter.end()
+            image.save(path)
         QMessageBox.information(self, "Exportiert", "Bild wurde exportiert.")
 
     def export_pdf(self):
         path, _ = QFileDialog.getSaveFileName(self, "Als PDF exportieren", "", "PDF-Datei (*.pdf)")
         if not path:
             return
-        from PyQt5.QtPrintSupport import QPrinter
-        printer = QPrinter(QPrinter.HighResolution)
-        printer.setOutputFormat(QPrinter.PdfFormat)
-        printer.setOutputFileName(path)
-        rect = self.scene.itemsBoundingRect()
-        printer.setPaperSize(rect.size(), QPrinter.Point)
-        painter = QPainter(printer)
-        self.scene.render(painter, QRectF(printer.pageRect()), rect)
-        painter.end()
-        QMessageBox.information(self, "Exportiert", "PDF wurde exportiert.")
+        names = [name for name, _, _ in PDF_PAGE_FORMATS]
+        name, ok = QInputDialog.getItem(self, "Seitenformat", "Format:", names, 0, False)
+        if not ok:
+            return
+        _, page_size, orientation = PDF_PAGE_FORMATS[names.index(name)]
+        pages = export_pdf_pages(self.scene, path, page_size, orientation)
+        QMessageBox.information(self, "Exportiert", f"PDF wurde exportiert ({pages} Seiten).")
+
+    def export_svg(self):
+        path, _ = QFileDialog.getSaveFileName(self, "Als SVG exportieren", "", "SVG-Grafik (*.svg)")
+        if not path:
+            return
+        with open(path, "w", encoding="utf-8") as f:
+            write_svg(self.scene, f)
+        QMessageBox.information(self, "Exportiert", "SVG wurde exportiert.")
 
     def export_table(self):
-        path, _ = QFileDialog.getSaveFileName(self, "Tabelle exportieren", "", "CSV-Datei (*.csv)")
+        path, _ = QFileDialog.getSaveFileName(
+            self, "Tabelle exportieren", "",
+            "CSV-Datei (*.csv);;TSV-Datei (*.tsv);;JSON Lines (*.jsonl);;Spaltenformat (*.dtab)")
         if not path:
             return
-        rows = self.table.rowCount()
-        cols = self.table.columnCount()
-        with open(path, 'w', encoding='utf-8') as f:
-            for r in range(rows):
-                line = []
-                for c in range(cols):
-                    item = self.table.item(r, c)
-                    line.append(item.text() if item else "")
-                f.write(','.join(line) + '\n')
+        self.scene.export_table(path)
         QMessageBox.information(self, "Exportiert", "Tabelle wurde exportiert.")
 
     def create_template(self):
@@ -632,33 +2430,104 @@ class MainWindow(QMainWindow):
         with open(TEMPLATES_FILE, "w") as f:
             json.dump(data, f, indent=4)
 
-    def update_table(self):
-        total_rows = len(self.scene.nodes) + len(self.scene.edges)
-        self.table.setRowCount(total_rows)
-        row = 0
-        # Knoten
-        for node in self.scene.nodes:
-            self.table.setItem(row, 0, QTableWidgetItem(node.text1))
-            self.table.setItem(row, 1, QTableWidgetItem(node.text2))
-            self.table.setItem(row, 2, QTableWidgetItem(node.shape))
-            self.table.setItem(row, 3, QTableWidgetItem(f"{node.color1.name()}/{node.color2.name()}"))
-            row += 1
-        # Verbindungen
-        for edge in self.scene.edges:
-            src_label = edge.source.text1
-            dest_label = edge.dest.text1
-            self.table.setItem(row, 0, QTableWidgetItem("Verbindung"))
-            self.table.setItem(row, 1, QTableWidgetItem(f"{src_label} → {dest_label}"))
-            style_name = {
-                Qt.SolidLine: "Durchgezogen",
-                Qt.DashLine: "Gestrichelt",
-                Qt.DotLine: "Gepunktet"
-            }.get(edge.pen.style(), "Durchgezogen")
-            self.table.setItem(row, 2, QTableWidgetItem(style_name))
-            self.table.setItem(row, 3, QTableWidgetItem(edge.label_text))
-            row += 1
+# Export ohne Oberfläche, z. B. für nächtliche Dokumentations-Builds:
+#   python Diagramm_editor_v5.2.py export in.json --png out.png --pdf out.pdf --csv out.csv
+#   python Diagramm_editor_v5.2.py export diagramme/ --png --pdf --svg --out-dir build/ -j 8
+EXPORT_INPUT_EXTENSIONS = (".json", ".dgrm", ".gz")
+CLI_PAGE_FORMATS = ["a4", "a4-quer", "a3", "a3-quer"]
+
+_export_app = None
+
+def init_export_worker():
+    global _export_app
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    _export_app = QApplication.instance() or QApplication(["diagramm-export"])
+
+def export_diagram_file(path, png=None, pdf=None, csv=None, dpi=EXPORT_BASE_DPI, page_format=0, svg=None):
+    scene = DiagramScene()
+    with open(path, "rb") as f:
+        scene.load_file(f)
+    # Aufgeschobenes Textlayout der Knoten ausführen
+    QApplication.processEvents()
+    if png:
+        with open(png, "wb") as f:
+            export_png_tiled(scene, f, dpi / EXPORT_BASE_DPI, dpi)
+    if pdf:
+        _, page_size, orientation = PDF_PAGE_FORMATS[page_format]
+        export_pdf_pages(scene, pdf, page_size, orientation)
+    if csv:
+        scene.export_table(csv)
+    if svg:
+        with open(svg, "w", encoding="utf-8") as f:
+            write_svg(scene, f)
+    return path
+
+def export_target(value, source, extension, out_dir, batch):
+    if value and not batch:
+        return value
+    if value is None:
+        return None
+    stem = os.path.basename(source)
+    for ext in (".gz", ".json", ".dgrm"):
+        if stem.lower().endswith(ext):
+            stem = stem[:-len(ext)]
+    return os.path.join(out_dir or os.path.dirname(source), stem + extension)
+
+def run_cli(argv):
+    parser = argparse.ArgumentParser(prog=os.path.basename(sys.argv[0]),
+                                     description="Diagramme ohne Oberfläche exportieren")
+    commands = parser.add_subparsers(dest="command", required=True)
+    export = commands.add_parser("export", help="Diagrammdatei oder Verzeichnis exportieren")
+    export.add_argument("input", help="*.json/*.dgrm-Datei oder Verzeichnis")
+    export.add_argument("--png", nargs="?", const="", help="PNG-Bild (Zieldatei optional)")
+    export.add_argument("--pdf", nargs="?", const="", help="PDF-Datei (Zieldatei optional)")
+    export.add_argument("--csv", nargs="?", const="", help="Tabelle (Zieldatei optional, Format nach Endung: .csv/.tsv/.jsonl/.dtab)")
+    export.add_argument("--svg", nargs="?", const="", help="SVG-Grafik (Zieldatei optional)")
+    export.add_argument("--dpi", type=int, default=EXPORT_BASE_DPI)
+    export.add_argument("--page", choices=CLI_PAGE_FORMATS, default=CLI_PAGE_FORMATS[0])
+    export.add_argument("--out-dir", help="Zielverzeichnis für abgeleitete Dateinamen")
+    export.add_argument("-j", "--jobs", type=int, default=None, help="Anzahl paralleler Prozesse")
+    args = parser.parse_args(argv)
+    if args.png is None and args.pdf is None and args.csv is None and args.svg is None:
+        parser.error("mindestens eines von --png, --pdf, --csv, --svg angeben")
+    if args.out_dir:
+        os.makedirs(args.out_dir, exist_ok=True)
+
+    batch = os.path.isdir(args.input)
+    if batch:
+        sources = sorted(os.path.join(args.input, name) for name in os.listdir(args.input)
+                         if name.lower().endswith(EXPORT_INPUT_EXTENSIONS))
+    else:
+        sources = [args.input]
+    page_format = CLI_PAGE_FORMATS.index(args.page)
+    tasks = [(source,
+              export_target(args.png, source, ".png", args.out_dir, batch),
+              export_target(args.pdf, source, ".pdf", args.out_dir, batch),
+              export_target(args.csv, source, ".csv", args.out_dir, batch),
+              args.dpi, page_format,
+              export_target(args.svg, source, ".svg", args.out_dir, batch)) for source in sources]
+
+    if not batch:
+        init_export_worker()
+        export_diagram_file(*tasks[0])
+        return 0
+    # Jeder Prozess braucht seine eigene QApplication; "spawn" vermeidet,
+    # dass Qt-Zustand per fork in die Worker kopiert wird
+    with ProcessPoolExecutor(max_workers=args.jobs, initializer=init_export_worker,
+                             mp_context=multiprocessing.get_context("spawn")) as pool:
+        failed = 0
+        futures = {pool.submit(export_diagram_file, *task): task[0] for task in tasks}
+        for future in as_completed(futures):
+            try:
+                print(future.result())
+            except Exception as e:
+                failed += 1
+                print(f"{futures[future]}: {e}", file=sys.stderr)
+    return 1 if failed else 0
 
 if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "export":
+        sys.exit(run_cli(sys.argv[1:]))
     app = QApplication(sys.argv)
     window = MainWindow()
     window.show()
@@ -1,36 +1,230 @@
 import sys
+import os
 import json
+import csv
+import math
+import time
+import codecs
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QAction, QFileDialog, QGraphicsScene,
     QGraphicsView, QGraphicsItem, QGraphicsTextItem, QGraphicsLineItem,
     QMenu, QColorDialog, QInputDialog, QMessageBox, QDialog,
-    QVBoxLayout, QTableWidget, QTableWidgetItem, QPushButton
+    QVBoxLayout, QTableWidget, QTableWidgetItem, QPushButton, QProgressDialog
 )
-from PyQt5.QtGui import QPainter, QPen, QBrush, QColor, QFont, QPixmap
-from PyQt5.QtCore import Qt, QPointF, QRectF, QLineF
+from PyQt5.QtGui import (
+    QPainter, QPen, QBrush, QColor, QFont, QPixmap, QPainterPath, QPolygonF,
+    QLinearGradient, QGradient, QPdfWriter, QPageSize, QPageLayout
+)
+from PyQt5.QtCore import Qt, QPointF, QRectF, QLineF, QTimer, QMarginsF
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Zweifarbige Füllung: ein Verlaufspinsel mit harter Kante (ein Füll- und ein
+# Konturdurchgang) oder die alte Variante mit getrennt gezeichneten Hälften
+FILL_GRADIENT = "gradient"
+FILL_CLIP = "clip"
+
+# Ab dieser Anzahl verschobener Verbindungen wird mit NumPy gesammelt geroutet
+BULK_ROUTING_MIN_EDGES = 64
+
+# Maximale Dauer einer Ladeportion in Sekunden
+LOAD_TIME_SLICE = 0.03
+# Fehler beim Lesen beschädigter oder abgeschnittener Dateien
+LOAD_ERRORS = (ValueError, KeyError, IndexError, TypeError, EOFError, OSError)
+
+# Bezugsauflösung: eine Szeneneinheit entspricht einem Pixel bei 96 DPI
+EXPORT_BASE_DPI = 96
+
+# Mehrseitiger PDF-Export: Überlappung benachbarter Seiten (Szeneneinheiten)
+# und Seitenrand in Millimetern
+PDF_PAGE_OVERLAP = 40
+PDF_PAGE_MARGIN_MM = 10
+PDF_PAGE_FORMATS = [
+    ("A4 Hochformat", QPageSize.A4, QPageLayout.Portrait),
+    ("A4 Querformat", QPageSize.A4, QPageLayout.Landscape),
+    ("A3 Hochformat", QPageSize.A3, QPageLayout.Portrait),
+    ("A3 Querformat", QPageSize.A3, QPageLayout.Landscape),
+]
+
+TABLE_HEADERS = ["Kästchen Text", "Verbunden mit"]
+
+_SHAPE_PATH_CACHE = {}
+_SPLIT_BRUSH_CACHE = {}
+
+
+# Liest ein JSON-Dokument der Form {"abschnitt": [datensatz, ...], ...}
+# stückweise und liefert (abschnitt, datensatz)-Paare, ohne die ganze Datei
+# auf einmal zu parsen. Werte, die keine Liste sind, werden als ein Paar
+# (abschnitt, wert) geliefert.
+class JsonStreamReader:
+    def __init__(self, f, chunk_size=1 << 16):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.decoder = json.JSONDecoder()
+        self.text_decoder = codecs.getincrementaldecoder("utf-8")()
+        self.buf = ""
+        self.pos = 0
+        self.bytes_read = 0
+        self.eof = False
+
+    def _fill(self):
+        if self.eof:
+            return False
+        chunk = self.f.read(self.chunk_size)
+        self.bytes_read += len(chunk)
+        if not chunk:
+            self.eof = True
+        self.buf = self.buf[self.pos:] + self.text_decoder.decode(chunk, final=self.eof)
+        self.pos = 0
+        return True
+
+    def _peek(self):
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in " \t\r\n":
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                raise ValueError("Unerwartetes Dateiende")
+
+    def _expect(self, char):
+        if self._peek() != char:
+            raise ValueError(f"'{char}' erwartet an Position {self.bytes_read}")
+        self.pos += 1
+
+    def _value(self):
+        while True:
+            self._peek()
+            try:
+                value, end = self.decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            # Eine Zahl am Pufferende könnte abgeschnitten sein
+            if end == len(self.buf) and not self.eof:
+                self._fill()
+                continue
+            self.pos = end
+            return value
+
+    def records(self):
+        self._expect("{")
+        if self._peek() == "}":
+            return
+        while True:
+            key = self._value()
+            self._expect(":")
+            if self._peek() == "[":
+                self.pos += 1
+                if self._peek() == "]":
+                    self.pos += 1
+                else:
+                    while True:
+                        yield key, self._value()
+                        char = self._peek()
+                        self.pos += 1
+                        if char == "]":
+                            break
+                        if char != ",":
+                            raise ValueError(f"',' oder ']' erwartet an Position {self.bytes_read}")
+            else:
+                yield key, self._value()
+            char = self._peek()
+            self.pos += 1
+            if char == "}":
+                return
+            if char != ",":
+                raise ValueError(f"',' oder '}}' erwartet an Position {self.bytes_read}")
+
+
+def cached_shape_path(shape, width, height):
+    key = (shape, width, height)
+    path = _SHAPE_PATH_CACHE.get(key)
+    if path is None:
+        path = QPainterPath()
+        if shape == "ellipse":
+            path.addEllipse(QRectF(0, 0, width, height))
+        elif shape == "triangle":
+            path.addPolygon(QPolygonF([
+                QPointF(width / 2, 0), QPointF(width, height), QPointF(0, height)
+            ]))
+            path.closeSubpath()
+        else:
+            path.addRect(QRectF(0, 0, width, height))
+        _SHAPE_PATH_CACHE[key] = path
+    return path
+
+
+def cached_split_brush(color_top, color_bottom):
+    key = (color_top.rgba(), color_bottom.rgba())
+    brush = _SPLIT_BRUSH_CACHE.get(key)
+    if brush is None:
+        # Koordinaten relativ zum Begrenzungsrechteck, daher für alle Größen gleich
+        gradient = QLinearGradient(0, 0, 0, 1)
+        gradient.setCoordinateMode(QGradient.ObjectBoundingMode)
+        gradient.setColorAt(0.0, color_top)
+        gradient.setColorAt(0.5, color_top)
+        gradient.setColorAt(0.500001, color_bottom)
+        gradient.setColorAt(1.0, color_bottom)
+        brush = QBrush(gradient)
+        _SPLIT_BRUSH_CACHE[key] = brush
+    return brush
+
+
+# Ankerpunkte von Verbindungen: Schnitt des Strahls vom Mittelpunkt der Form
+# in Richtung Zielpunkt mit dem Formrand. Für jede (konvexe) Form gibt es eine
+# Normfunktion g(u, v) in auf die halbe Breite/Höhe normierten Koordinaten,
+# der Randpunkt liegt bei Mittelpunkt + (dx, dy) / g.
+def shape_gauge(shape, u, v):
+    if shape == "ellipse":
+        return math.hypot(u, v)
+    if shape == "diamond":
+        return abs(u) + abs(v)
+    if shape == "triangle":
+        return max(v, 2 * u - v, -2 * u - v)
+    if shape == "hexagon":
+        return max(abs(v), abs(u) + abs(v) / 2)
+    return max(abs(u), abs(v))
+
+
+def anchor_point(shape, cx, cy, width, height, tx, ty):
+    dx = tx - cx
+    dy = ty - cy
+    if width <= 0 or height <= 0 or (dx == 0 and dy == 0):
+        return cx, cy
+    g = shape_gauge(shape, dx / (width / 2), dy / (height / 2))
+    return cx + dx / g, cy + dy / g
+
+
+def anchor_points_bulk(shapes, cx, cy, width, height, tx, ty):
+    # Vektorisierte Variante von anchor_point für viele Verbindungen auf einmal
+    shapes = np.asarray(shapes)
+    dx = np.asarray(tx, dtype=float) - cx
+    dy = np.asarray(ty, dtype=float) - cy
+    with np.errstate(divide="ignore", invalid="ignore"):
+        u = dx / (np.asarray(width, dtype=float) / 2)
+        v = dy / (np.asarray(height, dtype=float) / 2)
+        au = np.abs(u)
+        av = np.abs(v)
+        g = np.maximum(au, av)
+        g = np.where(shapes == "ellipse", np.hypot(u, v), g)
+        g = np.where(shapes == "diamond", au + av, g)
+        g = np.where(shapes == "triangle", np.maximum(v, np.maximum(2 * u - v, -2 * u - v)), g)
+        g = np.where(shapes == "hexagon", np.maximum(av, au + av / 2), g)
+        k = np.where(np.isfinite(g) & (g > 0), 1 / g, 0.0)
+    return cx + dx * k, cy + dy * k
 
 
 def get_edge_point(item, other_center):
     rect = item.sceneBoundingRect()
     center = rect.center()
-    line = QLineF(center, other_center)
-
-    # Vier Kanten des Rechtecks als Linien definieren
-    rect_edges = [
-        QLineF(rect.topLeft(), rect.topRight()),
-        QLineF(rect.bottomLeft(), rect.bottomRight()),
-        QLineF(rect.topLeft(), rect.bottomLeft()),
-        QLineF(rect.topRight(), rect.bottomRight())
-    ]
-
-    for edge in rect_edges:
-        intersect_point = QPointF()
-        intersect_type = line.intersect(edge, intersect_point)
-        if intersect_type == QLineF.BoundedIntersection:
-            return intersect_point
-
-    # Fallback: Mittelpunkt
-    return center
+    x, y = anchor_point(item.shape, center.x(), center.y(), rect.width(), rect.height(),
+                        other_center.x(), other_center.y())
+    return QPointF(x, y)
 
 
 class DiagramItem(QGraphicsItem):
@@ -45,7 +239,8 @@ class DiagramItem(QGraphicsItem):
         self.fill_color_bottom = QColor(fill_colors[1])
         self.border_color = QColor(border_color)
         self.texts = list(texts)
-        self.setFlags(QGraphicsItem.ItemIsSelectable | QGraphicsItem.ItemIsMovable)
+        self.setFlags(QGraphicsItem.ItemIsSelectable | QGraphicsItem.ItemIsMovable |
+                      QGraphicsItem.ItemSendsGeometryChanges)
         self.edges = []
 
     def boundingRect(self):
@@ -57,7 +252,11 @@ class DiagramItem(QGraphicsItem):
         painter.setPen(pen)
 
         rect = QRectF(0, 0, self.width, self.height)
-        if self.shape == "rectangle":
+        scene = self.scene()
+        if getattr(scene, "fill_mode", FILL_GRADIENT) == FILL_GRADIENT:
+            painter.setBrush(cached_split_brush(self.fill_color_top, self.fill_color_bottom))
+            painter.drawPath(cached_shape_path(self.shape, self.width, self.height))
+        elif self.shape == "rectangle":
             top_rect = QRectF(0, 0, self.width, self.height / 2)
             bottom_rect = QRectF(0, self.height / 2, self.width, self.height / 2)
             painter.setBrush(QBrush(self.fill_color_top))
@@ -171,9 +370,10 @@ class DiagramItem(QGraphicsItem):
             self.edges.remove(edge)
 
     def itemChange(self, change, value):
-        if change == QGraphicsItem.ItemPositionChange:
-            for edge in self.edges:
-                edge.update_position()
+        if change == QGraphicsItem.ItemPositionHasChanged:
+            scene = self.scene()
+            if scene is not None:
+                scene.schedule_edge_updates(self.edges)
         return super().itemChange(change, value)
 
     def to_dict(self):
@@ -233,7 +433,9 @@ class Edge(QGraphicsLineItem):
 
         p1 = get_edge_point(self.source, dest_center)
         p2 = get_edge_point(self.dest, source_center)
+        self.set_endpoints(p1, p2)
 
+    def set_endpoints(self, p1, p2):
         self.setLine(QLineF(p1, p2))
         mid = QLineF(p1, p2).pointAt(0.5)
         self.text_item.setPos(mid.x(), mid.y())
@@ -283,6 +485,10 @@ class Edge(QGraphicsLineItem):
 
     @staticmethod
     def from_dict(data, items):
+        for key in ("source_index", "dest_index"):
+            # Negative Indizes würden sonst still vom Listenende gezählt
+            if not 0 <= data[key] < len(items):
+                raise ValueError(f"Verbindung verweist auf unbekanntes Kästchen ({key} = {data[key]})")
         source = items[data["source_index"]]
         dest = items[data["dest_index"]]
         edge = Edge(source, dest, style=data.get("style", "solid"), label=data.get("label", ""))
@@ -297,6 +503,12 @@ class DiagramScene(QGraphicsScene):
         self.saved_shapes = []
         self.connect_mode = False
         self.connect_source = None
+        self.fill_mode = FILL_GRADIENT
+        self.dirty_edges = set()
+
+    def set_fill_mode(self, mode):
+        self.fill_mode = mode
+        self.update()
 
     def mousePressEvent(self, event):
         if self.connect_mode:
@@ -366,7 +578,41 @@ class DiagramScene(QGraphicsScene):
             data = item.to_dict()
             self.saved_shapes.append({"name": name, "data": data})
 
+    # Verbindungen verschobener Kästchen werden gesammelt und einmal pro
+    # Durchlauf der Event-Loop neu berechnet, jede Kante höchstens einmal
+    def schedule_edge_updates(self, edges):
+        if not edges:
+            return
+        if not self.dirty_edges:
+            QTimer.singleShot(0, self.flush_edge_updates)
+        self.dirty_edges.update(edges)
+
+    def flush_edge_updates(self):
+        edges, self.dirty_edges = self.dirty_edges, set()
+        if np is not None and len(edges) >= BULK_ROUTING_MIN_EDGES:
+            self.route_edges_bulk(list(edges))
+            return
+        for edge in edges:
+            edge.update_position()
+
+    def route_edges_bulk(self, edges):
+        src_rects = [edge.source.sceneBoundingRect() for edge in edges]
+        dest_rects = [edge.dest.sceneBoundingRect() for edge in edges]
+        sx = np.array([r.center().x() for r in src_rects])
+        sy = np.array([r.center().y() for r in src_rects])
+        dx = np.array([r.center().x() for r in dest_rects])
+        dy = np.array([r.center().y() for r in dest_rects])
+        x1, y1 = anchor_points_bulk(
+            [edge.source.shape for edge in edges], sx, sy,
+            [r.width() for r in src_rects], [r.height() for r in src_rects], dx, dy)
+        x2, y2 = anchor_points_bulk(
+            [edge.dest.shape for edge in edges], dx, dy,
+            [r.width() for r in dest_rects], [r.height() for r in dest_rects], sx, sy)
+        for i, edge in enumerate(edges):
+            edge.set_endpoints(QPointF(x1[i], y1[i]), QPointF(x2[i], y2[i]))
+
     def clear(self):
+        self.dirty_edges.clear()
         super().clear()
 
     def to_dict(self):
@@ -387,46 +633,88 @@ class DiagramScene(QGraphicsScene):
         return {"items": item_list, "edges": edge_list, "saved_shapes": self.saved_shapes}
 
     def from_dict(self, data):
+        self.begin_load()
+        for key in ("items", "edges", "saved_shapes"):
+            for record in data.get(key, []):
+                self.load_record(key, record)
+        self.load_pending_edges()
+        self.end_load()
+
+    # Laden Datensatz für Datensatz, gemeinsam genutzt von from_dict und dem
+    # Laden in Zeitscheiben (ChunkedDiagramLoader). Verbindungen verweisen per
+    # Index auf Kästchen; stehen sie in der Datei vor oder zwischen den
+    # Kästchen, werden sie bis load_pending_edges() zurückgestellt.
+    def begin_load(self):
         self.clear()
-        self.saved_shapes = data.get("saved_shapes", [])
-        item_objs = []
-        for item_data in data.get("items", []):
-            item = DiagramItem.from_dict(item_data)
+        self.saved_shapes = []
+        self.loaded_items = []
+        self.items_complete = False
+        self.pending_edges = []
+
+    def load_record(self, key, record):
+        if key == "items":
+            item = DiagramItem.from_dict(record)
             self.addItem(item)
-            item_objs.append(item)
-        for edge_data in data.get("edges", []):
-            edge = Edge.from_dict(edge_data, item_objs)
-            self.addItem(edge)
+            self.loaded_items.append(item)
+            return
+        if self.loaded_items:
+            # Der Abschnitt "items" ist abgeschlossen, sobald danach ein
+            # anderer Abschnitt beginnt
+            self.items_complete = True
+        if key == "edges":
+            if self.items_complete:
+                self.addItem(Edge.from_dict(record, self.loaded_items))
+            else:
+                self.pending_edges.append(record)
+        elif key == "saved_shapes":
+            self.saved_shapes.append(record)
+
+    def load_pending_edges(self):
+        for record in self.pending_edges:
+            self.addItem(Edge.from_dict(record, self.loaded_items))
+        self.pending_edges = []
+
+    def end_load(self):
+        self.loaded_items = []
+        self.pending_edges = []
+
+    def clear_diagram(self):
+        self.clear()
 
-    def export_table(self, filename):
+    # Eine Zeile pro Kästchen; die Beschriftungen werden einmal berechnet
+    # statt für jede Verbindung erneut zusammengesetzt
+    def table_rows(self):
         items = [item for item in self.items() if isinstance(item, DiagramItem)]
-        with open(filename, "w", encoding="utf-8") as f:
-            f.write("\"Kästchen Text\",\"Verbunden mit\"\n")
-            for item in items:
-                connections = []
-                for edge in item.edges:
-                    other = edge.dest if edge.source is item else edge.source
-                    connections.append("/".join(other.texts))
-                line = f"\"{'/'.join(item.texts)}\",\"{';'.join(connections)}\"\n"
-                f.write(line)
+        labels = {item: "/".join(item.texts) for item in items}
+        for item in items:
+            connections = ";".join(labels.get(edge.dest if edge.source is item else edge.source, "")
+                                   for edge in item.edges)
+            yield labels[item], connections
+
+    def export_table(self, filename):
+        ext = os.path.splitext(filename)[1].lower()
+        with open(filename, "w", encoding="utf-8", newline="") as f:
+            if ext == ".jsonl":
+                for row in self.table_rows():
+                    f.write(json.dumps(dict(zip(TABLE_HEADERS, row)), ensure_ascii=False))
+                    f.write("\n")
+            else:
+                writer = csv.writer(f, delimiter="\t" if ext == ".tsv" else ",",
+                                    quoting=csv.QUOTE_ALL)
+                writer.writerow(TABLE_HEADERS)
+                writer.writerows(self.table_rows())
 
     def show_table_dialog(self):
         dialog = QDialog()
         dialog.setWindowTitle("Tabelle der Kästchen und Verbindungen")
         layout = QVBoxLayout()
         table = QTableWidget()
-        items = [item for item in self.items() if isinstance(item, DiagramItem)]
-        table.setRowCount(len(items))
+        rows = list(self.table_rows())
+        table.setRowCount(len(rows))
         table.setColumnCount(2)
-        table.setHorizontalHeaderLabels(["Kästchen Text", "Verbunden mit"])
-
-        for row, item in enumerate(items):
-            text_item = "/".join(item.texts)
-            connections = []
-            for edge in item.edges:
-                other = edge.dest if edge.source is item else edge.source
-                connections.append("/".join(other.texts))
-            conn_text = ";".join(connections)
+        table.setHorizontalHeaderLabels(TABLE_HEADERS)
+
+        for row, (text_item, conn_text) in enumerate(rows):
             table.setItem(row, 0, QTableWidgetItem(text_item))
             table.setItem(row, 1, QTableWidgetItem(conn_text))
 
@@ -439,11 +727,105 @@ class DiagramScene(QGraphicsScene):
         dialog.exec_()
 
     def export_table_dialog(self):
-        filename, _ = QFileDialog.getSaveFileName(None, "Tabelle speichern", "", "CSV-Datei (*.csv)")
+        filename, _ = QFileDialog.getSaveFileName(None, "Tabelle speichern", "",
+                                                  "CSV-Datei (*.csv);;TSV-Datei (*.tsv);;JSON Lines (*.jsonl)")
         if filename:
             self.export_table(filename)
 
 
+# Lädt ein Diagramm in Zeitscheiben aus der Event-Loop heraus, damit die
+# Oberfläche bedienbar bleibt und die ersten Knoten sofort sichtbar sind
+class ChunkedDiagramLoader:
+    def __init__(self, parent, scene, path, on_finished=None):
+        self.scene = scene
+        self.on_finished = on_finished
+        self.path = path
+        # Datei und Leser werden erst im ersten Schritt geöffnet, damit auch
+        # Fehler beim Öffnen im Dialog landen
+        self.file = None
+        self.reader = None
+        self.records = None
+        self.progress = QProgressDialog("Diagramm wird geladen …", "Abbrechen", 0, 0, parent)
+        self.progress.setWindowModality(Qt.WindowModal)
+        self.progress.setMinimumDuration(500)
+        self.progress.canceled.connect(self.cancel)
+        self.timer = QTimer()
+        self.timer.timeout.connect(self.step)
+        self.scene.begin_load()
+        self.timer.start(0)
+
+    def step(self):
+        deadline = time.perf_counter() + LOAD_TIME_SLICE
+        done = False
+        try:
+            if self.records is None:
+                self.file = open(self.path, "rb")
+                # Fortschritt in KiB, damit auch sehr große Dateien in den int-Bereich passen
+                self.progress.setMaximum(os.fstat(self.file.fileno()).st_size // 1024 + 1)
+                self.reader = JsonStreamReader(self.file)
+                self.records = self.reader.records()
+            while time.perf_counter() < deadline:
+                record = next(self.records, None)
+                if record is None:
+                    self.scene.load_pending_edges()
+                    done = True
+                    break
+                self.scene.load_record(*record)
+        except LOAD_ERRORS as e:
+            self.finish(False)
+            QMessageBox.warning(self.progress.parent(), "Fehler", f"Diagramm konnte nicht geladen werden: {e}")
+            return
+        if done:
+            self.finish(True)
+            return
+        self.progress.setValue(self.reader.bytes_read // 1024)
+
+    def cancel(self):
+        if self.timer.isActive():
+            self.finish(False)
+
+    def finish(self, ok):
+        self.timer.stop()
+        if self.file is not None:
+            self.file.close()
+        self.progress.canceled.disconnect(self.cancel)
+        self.progress.reset()
+        if not ok:
+            self.scene.clear_diagram()
+        self.scene.end_load()
+        if self.on_finished:
+            self.on_finished(ok)
+
+
+def export_pdf_pages(scene, path, page_size=QPageSize.A4, orientation=QPageLayout.Portrait,
+                     overlap=PDF_PAGE_OVERLAP):
+    writer = QPdfWriter(path)
+    writer.setResolution(EXPORT_BASE_DPI)
+    writer.setPageLayout(QPageLayout(QPageSize(page_size), orientation,
+                                     QMarginsF(*[PDF_PAGE_MARGIN_MM] * 4), QPageLayout.Millimeter))
+    page_w = writer.width()
+    page_h = writer.height()
+    step_x = max(1, page_w - overlap)
+    step_y = max(1, page_h - overlap)
+    rect = scene.itemsBoundingRect()
+    columns = max(1, math.ceil((rect.width() - overlap) / step_x))
+    rows = max(1, math.ceil((rect.height() - overlap) / step_y))
+    painter = QPainter(writer)
+    pages = 0
+    for r in range(rows):
+        for c in range(columns):
+            source = QRectF(rect.left() + c * step_x, rect.top() + r * step_y, page_w, page_h)
+            # Leere Seiten über den Szenenindex erkennen und auslassen
+            if not scene.items(source):
+                continue
+            if pages:
+                writer.newPage()
+            scene.render(painter, QRectF(0, 0, page_w, page_h), source)
+            pages += 1
+    painter.end()
+    return pages
+
+
 class MainWindow(QMainWindow):
     def __init__(self):
         super().__init__()
@@ -520,9 +902,10 @@ class MainWindow(QMainWindow):
     def load_diagram(self):
         filename, _ = QFileDialog.getOpenFileName(self, "Diagramm laden", "", "Diagramm-Datei (*.json)")
         if filename:
-            with open(filename, "r", encoding="utf-8") as f:
-                data = json.load(f)
-                self.scene.from_dict(data)
+            self.loader = ChunkedDiagramLoader(self, self.scene, filename, self.load_finished)
+
+    def load_finished(self, ok):
+        self.loader = None
 
     def add_new_box(self):
         center_point = self.view.mapToScene(self.view.viewport().rect().center())
@@ -549,14 +932,12 @@ class MainWindow(QMainWindow):
     def export_pdf(self):
         filename, _ = QFileDialog.getSaveFileName(self, "Als PDF speichern", "", "PDF-Datei (*.pdf)")
         if filename:
-            from PyQt5.QtPrintSupport import QPrinter
-            printer = QPrinter(QPrinter.HighResolution)
-            printer.setOutputFormat(QPrinter.PdfFormat)
-            printer.setOutputFileName(filename)
-            painter = QPainter(printer)
-            rect = self.scene.itemsBoundingRect()
-            self.scene.render(painter, QRectF(printer.pageRect()), rect)
-            painter.end()
+            names = [name for name, _, _ in PDF_PAGE_FORMATS]
+            name, ok = QInputDialog.getItem(self, "Seitenformat", "Format:", names, 0, False)
+            if not ok:
+                return
+            _, page_size, orientation = PDF_PAGE_FORMATS[names.index(name)]
+            export_pdf_pages(self.scene, filename, page_size, orientation)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,64 @@
+# Zeichenzeit pro Knoten für beide Füllarten (Verlaufspinsel und geclippte
+# Hälften), je Form. Aufruf: python tests/bench_fill_modes.py
+import os
+import sys
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from PyQt5.QtCore import QRectF, Qt
+from PyQt5.QtGui import QColor, QImage, QPainter
+from PyQt5.QtWidgets import QApplication, QStyleOptionGraphicsItem
+
+from conftest import load_editor
+
+ROUNDS = 5000
+
+
+def paint_time(item, painter):
+    option = QStyleOptionGraphicsItem()
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        item.paint(painter, option, None)
+    return (time.perf_counter() - start) / ROUNDS * 1e6
+
+
+def compare(label, scene, item, editor, painter):
+    scene.addItem(item)
+    times = {}
+    for mode in (editor.FILL_CLIP, editor.FILL_GRADIENT):
+        scene.set_fill_mode(mode)
+        paint_time(item, painter)
+        times[mode] = paint_time(item, painter)
+    print(f"  {label:<10} {times[editor.FILL_CLIP]:8.1f} µs {times[editor.FILL_GRADIENT]:8.1f} µs")
+
+
+def main():
+    app = QApplication.instance() or QApplication([])
+    v52 = load_editor("Diagramm_editor_v5.2.py", "diagramm_editor_v52")
+    v60 = load_editor("Diagramm_editor_v6.0.py", "diagramm_editor_v60")
+    image = QImage(200, 200, QImage.Format_ARGB32_Premultiplied)
+    image.fill(0)
+    painter = QPainter(image)
+    painter.setRenderHint(QPainter.Antialiasing)
+    painter.translate(20, 20)
+    print(f"Mittel über {ROUNDS} paint()-Aufrufe, 120x80, Antialiasing")
+    print(f"  {'Form':<10} {'geclippt':>11} {'Verlauf':>11}")
+    print("v5.2 NodeItem")
+    scene = v52.DiagramScene()
+    for shape in ("rect", "ellipse", "diamond", "triangle", "hexagon"):
+        item = v52.NodeItem(shape=shape, rect=QRectF(0, 0, 120, 80),
+                            color1=QColor("steelblue"), color2=QColor("khaki"))
+        compare(shape, scene, item, v52, painter)
+    print("v6.0 DiagramItem")
+    scene = v60.DiagramScene()
+    for shape in ("rectangle", "ellipse", "triangle"):
+        item = v60.DiagramItem(shape=shape, width=120, height=80, fill_colors=(Qt.blue, Qt.yellow))
+        compare(shape, scene, item, v60, painter)
+    painter.end()
+    app.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+# Treffertests im Tkinter-Editor mit 10.000 Kästchen: Gitterindex gegen das
+# frühere find_closest mit linearer Suche, dazu Verbindungen und
+# Auswahlrechteck. Braucht eine Anzeige (X11/Windows/macOS).
+# Aufruf: python tests/bench_v4_hit_testing.py
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from conftest import load_editor
+
+BOXES = 10000
+CLICKS = 1000
+
+
+# Früheres find_box_at: nächstes Canvas-Element, dann alle Kästchen durchsuchen
+def closest_box(editor, x, y):
+    found = editor.canvas.find_closest(x, y)
+    if not found:
+        return None
+    for box in editor.boxes.values():
+        if found[0] in (box["rect"], box["label"]):
+            return box
+    return None
+
+
+def linear_boxes_in_rect(editor, x1, y1, x2, y2):
+    found = []
+    for box in editor.boxes.values():
+        left, top, right, bottom = editor.get_box_bounds(box)
+        if left <= x2 and right >= x1 and top <= y2 and bottom >= y1:
+            found.append(box)
+    return found
+
+
+def timed(label, func, points):
+    start = time.perf_counter()
+    for point in points:
+        func(*point)
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<36} {elapsed / len(points) * 1e6:10.1f} µs/Aufruf")
+
+
+def main():
+    v4 = load_editor("Diagramm_editor_v4.py", "diagramm_editor_v4")
+    editor = v4.DiagramEditor()
+    editor.withdraw()
+    editor.history.push(editor.load_state(json.dumps({
+        "boxes": [{"id": i, "x": i % 100 * 150, "y": i // 100 * 100, "text": f"K{i}", "color": "lightblue"}
+                  for i in range(BOXES)],
+        "connections": [{"id": i, "from": i, "to": i + 1} for i in range(BOXES - 1) if (i + 1) % 100]
+    })))
+    rng = random.Random(1)
+    clicks = [(rng.uniform(0, 15000), rng.uniform(0, 10000)) for _ in range(CLICKS)]
+    # Mittelpunkte der waagrechten Verbindungen zwischen Nachbarkästchen
+    lines = [(i % 100 * 150 + 135, i // 100 * 100 + 30) for i in rng.sample(range(BOXES), CLICKS) if (i + 1) % 100]
+    bands = [(x, y, x + 600, y + 400) for x, y in clicks[:100]]
+
+    print(f"{BOXES} Kästchen, {len(editor.connections)} Verbindungen")
+    timed("find_box_at (Gitter)", editor.find_box_at, clicks)
+    timed("find_closest + Suche (alt)", lambda x, y: closest_box(editor, x, y), clicks)
+    timed("find_connection_at", editor.find_connection_at, lines)
+    timed("boxes_in_rect 600x400 (Gitter)", editor.boxes_in_rect, bands)
+    timed("Auswahlrechteck linear", lambda *band: linear_boxes_in_rect(editor, *band), bands)
+    editor.destroy()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+# Undo-Latenz im Tkinter-Editor mit 2.000 Kästchen: einzelne Befehle und ein
+# ganzer geladener Zustand, verglichen mit dem früheren Löschen und Neuaufbauen
+# des Canvas. Braucht eine Anzeige (X11/Windows/macOS).
+# Aufruf: python tests/bench_v4_undo.py
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from conftest import load_editor
+
+BOXES = 2000
+ROUNDS = 20
+
+
+def make_state(shift=0):
+    return json.dumps({
+        "boxes": [{"id": i, "x": i % 50 * 150 + shift, "y": i // 50 * 100, "text": f"K{i}", "color": "lightblue"}
+                  for i in range(BOXES)],
+        "connections": [{"id": i, "from": i, "to": i + 1} for i in range(BOXES - 1)]
+    })
+
+
+# Jede Messfunktion bereitet selbst vor und liefert nur die gemessene Dauer
+def report(label, measure, rounds=ROUNDS):
+    times = sorted(measure() for _ in range(rounds))
+    print(f"  {label:<40} {times[len(times) // 2] * 1000:9.2f} ms")
+
+
+def main():
+    v4 = load_editor("Diagramm_editor_v4.py", "diagramm_editor_v4")
+    editor = v4.DiagramEditor()
+    editor.withdraw()
+    full, shifted = make_state(), make_state(shift=10)
+    empty = json.dumps({"boxes": [], "connections": []})
+    editor.history.push(editor.load_state(full))
+    box = editor.boxes[BOXES // 2]
+
+    def undo_move():
+        editor.canvas.move(box["rect"], 5, 5)
+        editor.canvas.move(box["label"], 5, 5)
+        editor.index_box(box)
+        editor.update_box_connections(box)
+        editor.history.push(v4.MoveBoxCommand(box, 5, 5))
+        start = time.perf_counter()
+        editor.menu_undo()
+        return time.perf_counter() - start
+
+    def undo_load():
+        editor.history.push(editor.load_state(shifted))
+        start = time.perf_counter()
+        editor.menu_undo()
+        return time.perf_counter() - start
+
+    # Früheres Verhalten: jeder Undo-Schritt löschte alles und baute den
+    # gespeicherten Zustand neu auf
+    def rebuild():
+        start = time.perf_counter()
+        editor.load_state(empty)
+        editor.load_state(full)
+        return time.perf_counter() - start
+
+    print(f"{BOXES} Kästchen, {BOXES - 1} Verbindungen, Median")
+    report("Undo einer Verschiebung", undo_move)
+    report("Undo eines Ladevorgangs (alle bewegt)", undo_load, rounds=5)
+    report("Löschen und Neuaufbau (alt)", rebuild, rounds=5)
+    editor.destroy()
+
+
+if __name__ == "__main__":
+    main()
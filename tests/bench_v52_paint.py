@@ -0,0 +1,70 @@
+# Bildzeit beim Verschieben der Ansicht über 5.000 Knoten, mit und ohne
+# gemeinsam genutzte Formpfade. Aufruf: python tests/bench_v52_paint.py
+import os
+import sys
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from PyQt5.QtCore import QRectF
+from PyQt5.QtGui import QImage, QPainter
+from PyQt5.QtWidgets import QApplication
+
+from conftest import load_editor
+
+NODES = 5000
+FRAMES = 40
+VIEW = QRectF(0, 0, 1600, 1000)
+SHAPES = ["rect", "ellipse", "diamond", "triangle", "hexagon"]
+
+
+def build_scene(editor):
+    scene = editor.DiagramScene()
+    scene.set_fill_mode(editor.FILL_CLIP)
+    for i in range(NODES):
+        node = scene.add_node(editor.NodeItem(shape=SHAPES[i % len(SHAPES)], rect=QRectF(0, 0, 100, 60), text1=f"K{i}"))
+        node.setPos(i % 100 * 130, i // 100 * 90)
+    return scene
+
+
+def frame_time(scene):
+    image = QImage(int(VIEW.width()), int(VIEW.height()), QImage.Format_ARGB32_Premultiplied)
+    times = []
+    for frame in range(FRAMES):
+        source = VIEW.translated(frame * 300, frame * 40)
+        image.fill(0)
+        painter = QPainter(image)
+        start = time.perf_counter()
+        scene.render(painter, QRectF(image.rect()), source)
+        times.append(time.perf_counter() - start)
+        painter.end()
+    times.sort()
+    return times[len(times) // 2] * 1000
+
+
+def main():
+    app = QApplication.instance() or QApplication([])
+    editor = load_editor("Diagramm_editor_v5.2.py", "diagramm_editor_v52")
+    scene = build_scene(editor)
+    cached = frame_time(scene)
+
+    # Verhalten vor dem Cache: Pfad bei jedem paint() neu aufbauen
+    def uncached_shape_path(node):
+        r = node.rect()
+        return editor.build_shape_path(node.shape, r.width(), r.height()).translated(r.x(), r.y())
+
+    original = editor.NodeItem.shape_path
+    editor.NodeItem.shape_path = uncached_shape_path
+    try:
+        uncached = frame_time(scene)
+    finally:
+        editor.NodeItem.shape_path = original
+    print(f"{NODES} Knoten, Median über {FRAMES} Bilder")
+    print(f"  ohne Cache: {uncached:7.2f} ms/Bild")
+    print(f"  mit Cache:  {cached:7.2f} ms/Bild")
+    app.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+# Tabellenexport: 1.000.000 Zeilen durch alle Schreibfunktionen sowie der
+# Export direkt aus einer Szene im Vergleich zum zellweisen Auslesen des
+# Tabellenmodells. Aufruf: python tests/bench_v52_table_export.py
+import os
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from PyQt5.QtCore import QRectF
+from PyQt5.QtWidgets import QApplication
+
+from conftest import load_editor
+
+ROWS = 1000000
+SCENE_NODES = 50000
+SHAPES = ["rect", "ellipse", "diamond", "triangle", "hexagon"]
+
+
+def synthetic_rows():
+    for i in range(ROWS):
+        yield (f"Knoten {i}", f"Ort {i % 1000}", SHAPES[i % 5], "#d3d3d3/#ffffff")
+
+
+def timed(label, func):
+    start = time.perf_counter()
+    result = func()
+    print(f"  {label:<28} {time.perf_counter() - start:7.2f} s")
+    return result
+
+
+# Export vor der Umstellung: Zelle für Zelle aus der Tabelle, mit Kommas verbunden
+def cellwise_export(model, path):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(",".join(model.HEADERS) + "\n")
+        for row in range(model.rowCount()):
+            f.write(",".join(model.data(model.index(row, column))
+                             for column in range(model.columnCount())) + "\n")
+
+
+def main():
+    app = QApplication.instance() or QApplication([])
+    editor = load_editor("Diagramm_editor_v5.2.py", "diagramm_editor_v52")
+    header = editor.DiagramTableModel.HEADERS
+    with tempfile.TemporaryDirectory() as folder:
+        print(f"{ROWS} Zeilen je Format")
+        for ext, (write, binary) in editor.TABLE_FORMATS.items():
+            path = os.path.join(folder, "tabelle" + ext)
+            if binary:
+                with open(path, "wb") as f:
+                    timed(ext, lambda: write(f, header, synthetic_rows()))
+            else:
+                with open(path, "w", encoding="utf-8", newline="") as f:
+                    timed(ext, lambda: write(f, header, synthetic_rows()))
+        with open(os.path.join(folder, "tabelle.dtab"), "rb") as f:
+            timed(".dtab lesen", lambda: editor.read_table_columnar(f))
+
+        scene = editor.DiagramScene()
+        previous = None
+        for i in range(SCENE_NODES):
+            node = scene.add_node(editor.NodeItem(shape=SHAPES[i % 5], rect=QRectF(0, 0, 100, 60), text1=f"K{i}"))
+            if previous is not None:
+                scene.add_edge(editor.EdgeItem(previous, node))
+            previous = node
+        print(f"Szene mit {scene.table_model.rowCount()} Zeilen")
+        timed("zellweise aus dem Modell", lambda: cellwise_export(scene.table_model, os.path.join(folder, "alt.csv")))
+        timed("export_table (.csv)", lambda: scene.export_table(os.path.join(folder, "neu.csv")))
+    app.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+# 100.000 Ankerpunkte: alte Rechteck-Schnittsuche mit QLineF gegen die
+# geschlossenen Formeln (einzeln und mit NumPy). Aufruf:
+# python tests/bench_v60_anchors.py
+import os
+import random
+import sys
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from PyQt5.QtCore import QLineF, QPointF
+from PyQt5.QtWidgets import QApplication
+
+from conftest import load_editor
+
+CALLS = 100000
+
+
+# get_edge_point vor der Umstellung: vier QLineF-Kanten schneiden
+def qlinef_edge_point(item, other_center):
+    rect = item.sceneBoundingRect()
+    center = rect.center()
+    line = QLineF(center, other_center)
+    rect_edges = [
+        QLineF(rect.topLeft(), rect.topRight()),
+        QLineF(rect.bottomLeft(), rect.bottomRight()),
+        QLineF(rect.topLeft(), rect.bottomLeft()),
+        QLineF(rect.topRight(), rect.bottomRight())
+    ]
+    for edge in rect_edges:
+        intersect_point = QPointF()
+        if line.intersect(edge, intersect_point) == QLineF.BoundedIntersection:
+            return intersect_point
+    return center
+
+
+def timed(label, func):
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<32} {elapsed * 1000:8.1f} ms  {elapsed / CALLS * 1e6:6.2f} µs/Aufruf")
+
+
+def main():
+    app = QApplication.instance() or QApplication([])
+    editor = load_editor("Diagramm_editor_v6.0.py", "diagramm_editor_v60")
+    rng = random.Random(1)
+    scene = editor.DiagramScene()
+    items = []
+    for shape in ("rectangle", "ellipse", "triangle"):
+        item = editor.DiagramItem(shape=shape, width=120, height=80)
+        item.setPos(rng.uniform(-500, 500), rng.uniform(-500, 500))
+        scene.addItem(item)
+        items.append(item)
+    cases = [(items[i % len(items)], QPointF(rng.uniform(-2000, 2000), rng.uniform(-2000, 2000)))
+             for i in range(CALLS)]
+
+    print(f"{CALLS} Ankerpunkte")
+    timed("QLineF.intersect (alt)", lambda: [qlinef_edge_point(item, target) for item, target in cases])
+    timed("get_edge_point", lambda: [editor.get_edge_point(item, target) for item, target in cases])
+
+    # Reine Formel ohne Qt-Objekte, wie im gebündelten Kanten-Update
+    plain = []
+    for item, target in cases:
+        rect = item.sceneBoundingRect()
+        plain.append((item.shape, rect.center().x(), rect.center().y(), rect.width(), rect.height(),
+                      target.x(), target.y()))
+    timed("anchor_point", lambda: [editor.anchor_point(*args) for args in plain])
+    if editor.np is not None:
+        columns = [list(column) for column in zip(*plain)]
+        arrays = [columns[0]] + [editor.np.array(column) for column in columns[1:]]
+        timed("anchor_points_bulk (NumPy)", lambda: editor.anchor_points_bulk(*arrays))
+    app.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+import os
+import sys
+import importlib.util
+
+import pytest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+# Die Editoren sind Einzelskripte mit Punkten im Dateinamen und werden daher
+# direkt über ihren Pfad geladen
+def load_editor(filename, name):
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.spec_from_file_location(name, os.path.join(ROOT, filename))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture(scope="session")
+def qapp():
+    from PyQt5.QtWidgets import QApplication
+    return QApplication.instance() or QApplication([])
+
+
+@pytest.fixture(scope="session")
+def editor52(qapp):
+    return load_editor("Diagramm_editor_v5.2.py", "diagramm_editor_v52")
+
+
+@pytest.fixture(scope="session")
+def editor60(qapp):
+    return load_editor("Diagramm_editor_v6.0.py", "diagramm_editor_v60")
@@ -0,0 +1,61 @@
+import io
+
+from PyQt5.QtCore import QRectF, Qt
+from PyQt5.QtGui import QColor, QImage, QPainter
+
+
+def test_tiled_png_matches_scene_render(editor52):
+    scene = editor52.DiagramScene()
+    lower = editor52.NodeItem(rect=QRectF(0, 0, 100, 60), color1=QColor("#ff0000"), color2=QColor("#ff0000"))
+    upper = editor52.NodeItem(rect=QRectF(0, 0, 100, 60), color1=QColor("#0000ff"), color2=QColor("#0000ff"))
+    lower.setPos(0, 0)
+    upper.setPos(40, 20)
+    lower.setZValue(0)
+    upper.setZValue(1)
+    scene.add_node(lower)
+    scene.add_node(upper)
+
+    f = io.BytesIO()
+    # Kleine Kacheln, damit die Überlappung über Kachelgrenzen hinweg liegt
+    assert editor52.export_png_tiled(scene, f, tile_size=50)
+    tiled = QImage.fromData(f.getvalue(), "PNG")
+
+    rect = scene.itemsBoundingRect()
+    reference = QImage(tiled.width(), tiled.height(), QImage.Format_RGB888)
+    reference.fill(Qt.white)
+    painter = QPainter(reference)
+    scene.render(painter, QRectF(reference.rect()), rect)
+    painter.end()
+
+    point = upper.sceneBoundingRect().intersected(lower.sceneBoundingRect()).center() - rect.topLeft()
+    x, y = int(point.x()), int(point.y())
+    assert QColor(tiled.pixel(x, y)).name() == QColor(reference.pixel(x, y)).name() == "#0000ff"
+
+
+def dark_pixels(image, x1, x2):
+    return sum(1 for x in range(x1, x2) for y in range(image.height())
+               if QColor(image.pixel(x, y)).lightness() < 100)
+
+
+def test_node_label_crossing_a_tile_edge_is_painted(editor52):
+    scene = editor52.DiagramScene()
+    node = editor52.NodeItem(rect=QRectF(0, 0, 40, 40), text1="Sehr lange Beschriftung",
+                             color1=QColor("#ffffff"), color2=QColor("#ffffff"))
+    scene.add_node(node)
+
+    f = io.BytesIO()
+    assert editor52.export_png_tiled(scene, f, tile_size=64)
+    tiled = QImage.fromData(f.getvalue(), "PNG")
+
+    rect = scene.itemsBoundingRect()
+    reference = QImage(tiled.width(), tiled.height(), QImage.Format_RGB888)
+    reference.fill(Qt.white)
+    painter = QPainter(reference)
+    scene.render(painter, QRectF(reference.rect()), rect)
+    painter.end()
+
+    # Die zentrierte Beschriftung ragt links in die erste Kachelspalte, der
+    # 40 px breite Knoten selbst liegt ganz in der zweiten
+    assert node.sceneBoundingRect().left() - rect.left() > 64
+    assert dark_pixels(reference, 0, 64) > 0
+    assert dark_pixels(tiled, 0, 64) > dark_pixels(reference, 0, 64) // 2
@@ -0,0 +1,127 @@
+import gzip
+import io
+import struct
+
+import pytest
+
+NODES = [
+    {"id": 0, "shape": "rect", "color1": "#d3d3d3", "color2": "#ffffff",
+     "x": 10.0, "y": 20.0, "width": 100.0, "height": 60.0, "text1": "Start", "text2": ""},
+    {"id": 1, "shape": "diamond", "color1": "#ff0000", "color2": "#00ff00",
+     "x": -40.5, "y": 300.25, "width": 120.0, "height": 80.0, "text1": "Prüfen", "text2": "ja/nein"},
+    {"id": 5, "shape": "hexagon", "color1": "#0000ff", "color2": "#0000ff",
+     "x": 400.0, "y": 0.0, "width": 90.0, "height": 90.0, "text1": "Start", "text2": "Ende"},
+]
+EDGES = [
+    {"source": 0, "dest": 1, "style": 1, "label": ""},
+    {"source": 1, "dest": 5, "style": 2, "label": "weiter"},
+]
+
+
+def binary_file(editor52):
+    text = io.StringIO()
+    editor52.write_json_stream(text, [("nodes", NODES), ("edges", EDGES)])
+    records = list(editor52.diagram_reader(io.BytesIO(text.getvalue().encode("utf-8"))).records())
+    f = io.BytesIO()
+    editor52.write_diagram_binary(f, [r for k, r in records if k == "nodes"],
+                                  [r for k, r in records if k == "edges"])
+    return f.getvalue()
+
+
+def test_json_binary_roundtrip(editor52, tmp_path):
+    data = binary_file(editor52)
+    records = list(editor52.diagram_reader(io.BytesIO(data)).records())
+    assert [r for k, r in records if k == "nodes"] == NODES
+    assert [r for k, r in records if k == "edges"] == EDGES
+
+    path = tmp_path / "diagramm.dgrm"
+    path.write_bytes(data)
+    document = editor52.MappedDiagram(str(path))
+    try:
+        assert [document.node_record(i) for i in range(document.node_count)] == NODES
+        assert [document.edge_record(i) for i in range(document.edge_count)] == EDGES
+    finally:
+        document.close()
+
+
+def corrupt(data, columns, column, value):
+    # Offset der ersten Zelle einer Knotenspalte hinter Kopf und Texttabelle
+    text_count, = struct.unpack_from("<I", data, 6)
+    pos = 10
+    for _ in range(text_count):
+        size, = struct.unpack_from("<I", data, pos)
+        pos += 4 + size
+    count, = struct.unpack_from("<I", data, pos)
+    pos += 4
+    for key, typecode, _ in columns:
+        if key == column:
+            break
+        pos += struct.calcsize("<" + typecode) * count
+    data = bytearray(data)
+    struct.pack_into("<" + typecode, data, pos, value)
+    return bytes(data)
+
+
+@pytest.mark.parametrize("column, value", [("shape", 200), ("text1", 9999)])
+def test_corrupt_binary_raises_value_error(editor52, tmp_path, column, value):
+    data = corrupt(binary_file(editor52), editor52.BINARY_NODE_COLUMNS, column, value)
+    with pytest.raises(ValueError, match="Ungültige Datei"):
+        list(editor52.diagram_reader(io.BytesIO(data)).records())
+
+    path = tmp_path / "kaputt.dgrm"
+    path.write_bytes(data)
+    with pytest.raises(ValueError, match="Ungültige Datei"):
+        editor52.MappedDiagram(str(path))
+
+
+def test_truncated_binary_raises_value_error(editor52, tmp_path):
+    path = tmp_path / "kurz.dgrm"
+    path.write_bytes(binary_file(editor52)[:-20])
+    with pytest.raises(ValueError):
+        editor52.MappedDiagram(str(path))
+
+
+@pytest.mark.parametrize("suffix, damage", [
+    (".dgrm.gz", lambda data: gzip.compress(data)[:-30]),
+    (".dgrm", lambda data: data[:10] + b"\xff" * 8),
+])
+def test_chunked_loader_reports_broken_files(editor52, tmp_path, monkeypatch, suffix, damage):
+    path = tmp_path / ("kaputt" + suffix)
+    path.write_bytes(damage(binary_file(editor52)))
+    warnings = []
+    monkeypatch.setattr(editor52.QMessageBox, "warning", lambda *args: warnings.append(args))
+    results = []
+    scene = editor52.DiagramScene()
+    loader = editor52.ChunkedDiagramLoader(None, scene, str(path), results.append)
+    while loader.timer.isActive():
+        loader.step()
+    assert results == [False]
+    assert len(warnings) == 1
+    assert loader.file.closed
+    assert not scene.nodes
+
+
+@pytest.mark.parametrize("order", [("nodes", "edges"), ("edges", "nodes")])
+def test_sections_load_in_any_order(editor52, tmp_path, monkeypatch, order):
+    sections = {"nodes": NODES, "edges": EDGES}
+    path = tmp_path / "diagramm.json"
+    with open(path, "w", encoding="utf-8") as f:
+        editor52.write_json_stream(f, [(key, sections[key]) for key in order])
+    expected = sorted((edge["source"], edge["dest"], edge["label"]) for edge in EDGES)
+
+    def loaded_edges(scene):
+        return sorted((edge.source.node_id, edge.dest.node_id, edge.label_text) for edge in scene.edges)
+
+    scene = editor52.DiagramScene()
+    with open(path, "rb") as f:
+        scene.load_file(f)
+    assert loaded_edges(scene) == expected
+
+    monkeypatch.setattr(editor52.QMessageBox, "warning", lambda *args: pytest.fail(str(args)))
+    results = []
+    scene = editor52.DiagramScene()
+    loader = editor52.ChunkedDiagramLoader(None, scene, str(path), results.append)
+    while loader.timer.isActive():
+        loader.step()
+    assert results == [True]
+    assert loaded_edges(scene) == expected
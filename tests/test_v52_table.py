@@ -0,0 +1,79 @@
+import csv
+import io
+import struct
+
+import pytest
+
+from PyQt5.QtCore import QRectF
+
+
+def build_scene(editor52, count):
+    scene = editor52.DiagramScene()
+    nodes = [scene.add_node(editor52.NodeItem(rect=QRectF(0, 0, 100, 60), text1=f"N{i}")) for i in range(count)]
+    for a, b in zip(nodes, nodes[1:]):
+        scene.add_edge(editor52.EdgeItem(a, b))
+    return scene, nodes
+
+
+def signal_log(model):
+    log = []
+    model.modelReset.connect(lambda: log.append("reset"))
+    model.rowsInserted.connect(lambda parent, first, last: log.append(("insert", first, last)))
+    model.rowsRemoved.connect(lambda parent, first, last: log.append(("remove", first, last)))
+    return log
+
+
+def table_texts(model):
+    return [[model.data(model.index(row, column)) for column in range(model.columnCount())]
+            for row in range(model.rowCount())]
+
+
+def test_single_delete_and_undo_update_rows_incrementally(editor52):
+    scene, nodes = build_scene(editor52, 5)
+    model = scene.table_model
+    before = table_texts(model)
+    log = signal_log(model)
+
+    scene.delete_items([nodes[2]], [])
+    assert "reset" not in log
+    assert len(log) == 3
+    assert model.rowCount() == len(scene.nodes) + len(scene.edges)
+
+    scene.history.undo()
+    scene.history.redo()
+    scene.history.undo()
+    assert "reset" not in log
+    assert sorted(table_texts(model)) == sorted(before)
+
+
+def test_bulk_delete_resets_once(editor52):
+    scene, nodes = build_scene(editor52, editor52.TABLE_BULK_ROWS)
+    log = signal_log(scene.table_model)
+    scene.delete_items(nodes, [])
+    assert log == ["reset"]
+    assert scene.table_model.rowCount() == 0
+
+
+def test_table_export_matches_table_view(editor52, tmp_path):
+    scene, nodes = build_scene(editor52, 3)
+    nodes[1].text2 = "a, \"b\""
+    path = tmp_path / "tabelle.csv"
+    scene.export_table(str(path))
+    with open(path, encoding="utf-8", newline="") as f:
+        rows = list(csv.reader(f))
+    model = scene.table_model
+    assert rows[0] == model.HEADERS
+    assert rows[1:] == table_texts(model)
+
+
+def test_columnar_table_rejects_damaged_files(editor52):
+    f = io.BytesIO()
+    editor52.write_table_columnar(f, ["Name", "Wert"], [("a", "x"), ("b", "x"), ("c", "ü")])
+    data = f.getvalue()
+    assert editor52.read_table_columnar(io.BytesIO(data)) == (["Name", "Wert"], [["a", "b", "c"], ["x", "x", "ü"]])
+    for size in range(4, len(data)):
+        with pytest.raises(ValueError):
+            editor52.read_table_columnar(io.BytesIO(data[:size]))
+    # letzter Code der letzten Spalte zeigt hinter die Wertetabelle
+    with pytest.raises(ValueError):
+        editor52.read_table_columnar(io.BytesIO(data[:-4] + struct.pack("<I", 7)))
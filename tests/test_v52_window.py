@@ -0,0 +1,90 @@
+import pytest
+from PyQt5.QtCore import QRectF
+
+
+@pytest.fixture
+def window(editor52, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    window = editor52.MainWindow()
+    yield window
+    window.close_large_diagram()
+    window.autosave.stop()
+
+
+def save_binary(editor52, path, count=1):
+    scene = editor52.DiagramScene()
+    for i in range(count):
+        node = scene.add_node(editor52.NodeItem(rect=QRectF(0, 0, 100, 60), text1=f"Groß {i}"))
+        node.setPos(i * 150, 0)
+    with open(path, "wb") as f:
+        scene.write_binary(f)
+
+
+def test_large_view_asks_before_discarding_and_pauses_autosave(editor52, window, tmp_path, monkeypatch):
+    path = tmp_path / "gross.dgrm"
+    save_binary(editor52, path)
+    monkeypatch.setattr(editor52.QFileDialog, "getOpenFileName", lambda *args: (str(path), ""))
+    answers = []
+    monkeypatch.setattr(editor52.QMessageBox, "question", lambda *args: answers.pop(0))
+    window.scene.add_node(editor52.NodeItem(rect=QRectF(0, 0, 100, 60), text1="Entwurf"))
+
+    answers.append(editor52.QMessageBox.No)
+    window.view_large_diagram()
+    assert window.lazy_document is None
+    assert len(window.scene.nodes) == 1
+
+    answers.append(editor52.QMessageBox.Yes)
+    window.view_large_diagram()
+    assert window.lazy_document is not None
+    assert not window.autosave.timer.isActive()
+
+    window.close_large_diagram()
+    assert window.autosave.timer.isActive()
+    # Das Leeren der Szene beim Öffnen der Ansicht wird nicht nachträglich gesichert
+    window.autosave.autosave()
+    assert window.autosave.pending is None
+    assert not answers
+
+
+def test_large_view_cannot_edit_or_overwrite_the_file(editor52, window, tmp_path, monkeypatch):
+    path = tmp_path / "gross.dgrm"
+    save_binary(editor52, path, 50)
+    data = path.read_bytes()
+    monkeypatch.setattr(editor52.QFileDialog, "getOpenFileName", lambda *args: (str(path), ""))
+    monkeypatch.setattr(editor52.QFileDialog, "getSaveFileName", lambda *args: (str(path), ""))
+    monkeypatch.setattr(editor52.QMessageBox, "information", lambda *args: None)
+    window.view_large_diagram()
+    assert all(not action.isEnabled() for action in window.edit_actions)
+
+    count = len(window.scene.nodes)
+    window.add_node()
+    assert len(window.scene.nodes) == count
+    window.save_diagram()
+    assert path.read_bytes() == data
+
+    window.close_large_diagram()
+    assert all(action.isEnabled() for action in window.edit_actions)
+
+
+def test_autosave_snapshot_follows_changes(editor52):
+    scene = editor52.DiagramScene()
+    nodes = [scene.add_node(editor52.NodeItem(rect=QRectF(0, 0, 100, 60), text1=f"K{i}")) for i in range(4)]
+    edge = editor52.EdgeItem(nodes[0], nodes[1])
+    scene.add_edge(edge)
+    scene.add_edge(editor52.EdgeItem(nodes[2], nodes[3]))
+    scene.snapshot()
+
+    def fresh():
+        return (tuple(node.snapshot() for node in scene.nodes),
+                tuple(edge.snapshot() for edge in scene.edges))
+
+    nodes[1].setPos(40, 50)
+    nodes[2].set_texts("Neu", "Text")
+    edge.set_label("Beschriftung")
+    assert scene.snapshot() == fresh()
+    scene.remove_node(nodes[3])
+    assert scene.snapshot() == fresh()
+    nodes[3].setPos(10, 10)
+    assert scene.snapshot() == fresh()
+    scene.clear_diagram()
+    assert scene.snapshot() == ((), ())
@@ -0,0 +1,47 @@
+import json
+
+import pytest
+
+
+def run_loader(editor60, scene, path, monkeypatch):
+    warnings = []
+    monkeypatch.setattr(editor60.QMessageBox, "warning", lambda *args: warnings.append(args))
+    results = []
+    loader = editor60.ChunkedDiagramLoader(None, scene, str(path), results.append)
+    while loader.timer.isActive():
+        loader.step()
+    return results, warnings
+
+
+@pytest.mark.parametrize("index", [5, -1])
+def test_edge_with_unknown_item_is_reported(editor60, tmp_path, monkeypatch, index):
+    path = tmp_path / "kaputt.json"
+    path.write_text(json.dumps({
+        "items": [{"shape": "rectangle", "x": 0, "y": 0}, {"shape": "ellipse", "x": 200, "y": 0}],
+        "edges": [{"source_index": 0, "dest_index": index}],
+    }))
+    scene = editor60.DiagramScene()
+    results, warnings = run_loader(editor60, scene, path, monkeypatch)
+    assert results == [False]
+    assert len(warnings) == 1
+    assert not scene.items()
+
+
+@pytest.mark.parametrize("order", [("items", "edges"), ("edges", "items"), ("edges", "saved_shapes", "items")])
+def test_sections_load_in_any_order(editor60, tmp_path, monkeypatch, order):
+    data = {
+        "items": [{"shape": "rectangle", "x": 0, "y": 0, "texts": ["A", ""]},
+                  {"shape": "ellipse", "x": 200, "y": 0, "texts": ["B", ""]},
+                  {"shape": "diamond", "x": 0, "y": 200, "texts": ["C", ""]}],
+        "edges": [{"source_index": 0, "dest_index": 1, "label": "a-b"},
+                  {"source_index": 2, "dest_index": 0, "label": "c-a"}],
+        "saved_shapes": [],
+    }
+    path = tmp_path / "diagramm.json"
+    path.write_text(json.dumps({key: data[key] for key in order}))
+    scene = editor60.DiagramScene()
+    results, warnings = run_loader(editor60, scene, path, monkeypatch)
+    assert results == [True] and not warnings
+    edges = sorted((edge.source.texts[0], edge.dest.texts[0], edge.label_text)
+                   for edge in scene.items() if isinstance(edge, editor60.Edge))
+    assert edges == [("A", "B", "a-b"), ("C", "A", "c-a")]